@@ -4,9 +4,13 @@ Builds a conversational prompt (no JSON output requirement) that gives
 the LLM full awareness of the current game state for free-form Q&A.
 """
 
+import threading
+from collections import OrderedDict
+
 from models.enums import DepartmentId
 from models.game_state import GameState
 from agent.prompt_builder import (
+    _state_key,
     _format_situation,
     _format_department_summary,
     _format_upcoming_cards,
@@ -50,14 +54,16 @@ game state when relevant.\
 """
 
 
+_DEPT_NAMES = {"er": "ER", "surgery": "Surgery", "cc": "CC", "sd": "SD"}
+
+
 def _format_capacity_forecast(state: GameState, horizon: int) -> str:
     """Net patient flow forecast from known card sequences."""
     forecast = capacity_forecast(state, horizon)
     lines = ["## Capacity Forecast (net patient flow from cards)"]
-    dept_names = {"er": "ER", "surgery": "Surgery", "cc": "CC", "sd": "SD"}
     for dept_id, rounds in forecast.items():
-        flows = [f"R{r['round']}:{r['net_flow']:+d}" for r in rounds]
-        lines.append(f"- {dept_names.get(dept_id, dept_id)}: {', '.join(flows)}")
+        flows = ", ".join(f"R{r['round']}:{r['net_flow']:+d}" for r in rounds)
+        lines.append(f"- {_DEPT_NAMES.get(dept_id, dept_id)}: {flows}")
     return "\n".join(lines)
 
 
@@ -65,7 +71,6 @@ def _format_staff_analysis(state: GameState) -> str:
     """Staff efficiency and extra staff recommendations."""
     analysis = staff_efficiency_analysis(state)
     lines = ["## Staff Analysis"]
-    dept_names = {"er": "ER", "surgery": "Surgery", "cc": "CC", "sd": "SD"}
     for dept_id, info in analysis.items():
         parts = [f"{info['idle']} idle"]
         if info["deficit"] > 0:
@@ -76,7 +81,7 @@ def _format_staff_analysis(state: GameState) -> str:
             parts.append(f"recommend +{info['recommend_extra']} extra")
         if info["recommend_return"] > 0:
             parts.append(f"recommend return {info['recommend_return']}")
-        lines.append(f"- {dept_names.get(dept_id, dept_id)}: {', '.join(parts)}")
+        lines.append(f"- {_DEPT_NAMES.get(dept_id, dept_id)}: {', '.join(parts)}")
     return "\n".join(lines)
 
 
@@ -91,8 +96,30 @@ def _format_diversion_analysis(state: GameState) -> str:
     )
 
 
+# Small LRU of built contexts: chat turns within one step see the same state,
+# so the analytics passes only need to run once per step.
+_CONTEXT_CACHE_SIZE = 16
+_context_cache: OrderedDict[tuple, str] = OrderedDict()
+_context_lock = threading.Lock()
+
+
+def cached_chat_context(state: GameState, horizon: int = 6) -> str | None:
+    """Previously built context for this state, or None (never builds)."""
+    key = (_state_key(state), horizon)
+    with _context_lock:
+        cached = _context_cache.get(key)
+        if cached is not None:
+            _context_cache.move_to_end(key)
+        return cached
+
+
 def build_chat_context(state: GameState, horizon: int = 6) -> str:
     """Build game context string to append to the system prompt."""
+    cached = cached_chat_context(state, horizon)
+    if cached is not None:
+        return cached
+    key = (_state_key(state), horizon)
+
     sections = [
         _format_situation(state),
         _format_department_summary(state),
@@ -102,4 +129,10 @@ def build_chat_context(state: GameState, horizon: int = 6) -> str:
         _format_staff_analysis(state),
         _format_diversion_analysis(state),
     ]
-    return "\n\n".join(sections)
+    context = "\n\n".join(sections)
+
+    with _context_lock:
+        _context_cache[key] = context
+        if len(_context_cache) > _CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
+    return context
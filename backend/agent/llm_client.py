@@ -4,17 +4,168 @@ Supports Ollama, llama.cpp, vLLM, Claude (Anthropic), and OpenAI.
 All errors are wrapped in LLMClientError for uniform handling.
 """
 
+import asyncio
+import atexit
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+import random
 import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 
 import httpx
 
 from config import settings
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    import anthropic
+except ImportError:  # only needed for llm_provider=claude
+    anthropic = None
+
+logger = logging.getLogger(__name__)
+
+_JSON_HEADERS = {"content-type": "application/json"}
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    _loads = json.loads
+
+
+_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=16,
+    keepalive_expiry=90,
+)
+
+
+# Read timeout for the provider attempt in progress (None = llm_timeout_seconds)
+_read_timeout: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "_read_timeout", default=None
+)
+
+
+def _http_timeout(read: float | None = None) -> httpx.Timeout:
+    """Split timeout so a dead endpoint fails on connect, not after the full read budget."""
+    return httpx.Timeout(
+        connect=settings.llm_connect_timeout_seconds,
+        read=read if read is not None else settings.llm_timeout_seconds,
+        write=10.0,
+        pool=5.0,
+    )
+
+
+def _attempt_timeout() -> httpx.Timeout:
+    """Timeout for the current provider attempt (see LLMClient._call_chain)."""
+    return _http_timeout(_read_timeout.get())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_httpx_client() -> httpx.Client:
+    """Shared pooled HTTP client for all providers (raw httpx and SDK clients).
+
+    Created lazily so settings are read after env/.env loading; keep-alive
+    connections are reused across calls instead of reconnecting per request.
+    """
+    client = httpx.Client(timeout=_http_timeout(), limits=_POOL_LIMITS)
+    atexit.register(client.close)
+    return client
+
+
+@functools.lru_cache(maxsize=None)
+def _get_async_httpx_client() -> httpx.AsyncClient:
+    """Async counterpart of _get_httpx_client() for event-loop callers."""
+    return httpx.AsyncClient(timeout=_http_timeout(), limits=_POOL_LIMITS)
+
+
+async def aclose_http_clients() -> None:
+    """Close the shared HTTP pools and drop the clients built on them (app shutdown)."""
+    if _get_async_httpx_client.cache_info().currsize:
+        await _get_async_httpx_client().aclose()
+    if _get_httpx_client.cache_info().currsize:
+        _get_httpx_client().close()
+    for factory in (
+        _get_httpx_client, _get_async_httpx_client,
+        _get_anthropic_client, _get_async_anthropic_client,
+    ):
+        factory.cache_clear()
+
+
+_THINK_RE = re.compile(r"<think>[\s\S]*?</think>\s*")
+
 
 def _strip_thinking(text: str) -> str:
     """Remove <think>...</think> blocks from reasoning model output."""
-    return re.sub(r"<think>[\s\S]*?</think>\s*", "", text).strip()
+    if "<think>" not in text:
+        return text.strip()
+    return _THINK_RE.sub("", text).strip()
+
+
+class _ThinkFilter:
+    """Drop <think>...</think> spans from streamed text, including tags split across chunks."""
+
+    _OPEN = "<think>"
+    _CLOSE = "</think>"
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._inside = False
+        self._after_close = False  # skip whitespace after </think>, like _strip_thinking
+
+    def feed(self, chunk: str) -> str:
+        """Return the visible part of chunk; holds back a possible partial tag."""
+        self._buf += chunk
+        out = []
+        while self._buf:
+            if self._inside:
+                end = self._buf.find(self._CLOSE)
+                if end < 0:
+                    self._buf = self._buf[-(len(self._CLOSE) - 1):]
+                    break
+                self._buf = self._buf[end + len(self._CLOSE):]
+                self._inside = False
+                self._after_close = True
+                continue
+            if self._after_close:
+                self._buf = self._buf.lstrip()
+                if not self._buf:
+                    break
+                self._after_close = False
+            start = self._buf.find(self._OPEN)
+            if start >= 0:
+                out.append(self._buf[:start])
+                self._buf = self._buf[start + len(self._OPEN):]
+                self._inside = True
+                continue
+            keep = next(
+                (k for k in range(len(self._OPEN) - 1, 0, -1) if self._buf.endswith(self._OPEN[:k])),
+                0,
+            )
+            out.append(self._buf[:len(self._buf) - keep])
+            self._buf = self._buf[len(self._buf) - keep:]
+            break
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Text held back at end of stream (an unclosed <think> block is dropped)."""
+        text = "" if self._inside else self._buf
+        self._buf = ""
+        return text
 
 
 class LLMClientError(Exception):
@@ -22,7 +173,173 @@ class LLMClientError(Exception):
     pass
 
 
-@dataclass
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 529})
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Whether an exception is a transient provider failure worth retrying."""
+    if isinstance(exc, (httpx.TimeoutException, httpx.ConnectError, httpx.RemoteProtocolError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRYABLE_STATUSES
+    # SDK errors: APIStatusError carries status_code, connection errors wrap httpx
+    if getattr(exc, "status_code", None) in _RETRYABLE_STATUSES:
+        return True
+    return exc.__cause__ is not None and _is_retryable(exc.__cause__)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter: base..2*base, doubling per attempt."""
+    base = settings.llm_retry_base_delay
+    return random.uniform(base, 2 * base) * (2 ** attempt)
+
+
+# Circuit breaker state: provider -> (consecutive failures, cooldown-until monotonic time)
+_circuit: dict[str, tuple[int, float]] = {}
+
+
+def _circuit_open(provider: str) -> bool:
+    """True while a provider is cooling down after repeated failures."""
+    _, cooldown_until = _circuit.get(provider, (0, 0.0))
+    return time.monotonic() < cooldown_until
+
+
+def _record_failure(provider: str) -> None:
+    failures, _ = _circuit.get(provider, (0, 0.0))
+    failures += 1
+    cooldown_until = 0.0
+    if failures >= settings.llm_circuit_failure_threshold:
+        cooldown_until = time.monotonic() + settings.llm_circuit_cooldown_seconds
+        logger.warning("LLM provider %s failed %d times; skipping for %.0fs",
+                       provider, failures, settings.llm_circuit_cooldown_seconds)
+    _circuit[provider] = (failures, cooldown_until)
+
+
+def _record_success(provider: str) -> None:
+    _circuit.pop(provider, None)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_anthropic_client(api_key: str):
+    """Anthropic SDK client, built once per API key and sharing the HTTP pool."""
+    if anthropic is None:
+        raise LLMClientError("anthropic package not installed (pip install anthropic)")
+    return anthropic.Anthropic(api_key=api_key, max_retries=0, http_client=_get_httpx_client())
+
+
+@functools.lru_cache(maxsize=1)
+def _get_async_anthropic_client(api_key: str):
+    """AsyncAnthropic client, built once per API key on the async HTTP pool."""
+    if anthropic is None:
+        raise LLMClientError("anthropic package not installed (pip install anthropic)")
+    return anthropic.AsyncAnthropic(
+        api_key=api_key, max_retries=0, http_client=_get_async_httpx_client(),
+    )
+
+
+# Ollama model -> emits <think> blocks; filled by _ollama_thinks() on first use
+_ollama_thinking: dict[tuple[str, str], bool] = {}
+
+
+def _ollama_thinks(base_url: str, model: str) -> bool:
+    """Whether an Ollama model is a reasoning model, probed once via /api/show.
+
+    Only reasoning models get `think: false` and <think> stripping. If the
+    probe fails the answer is not cached and True is assumed (the safe side).
+    """
+    key = (base_url, model)
+    cached = _ollama_thinking.get(key)
+    if cached is not None:
+        return cached
+    try:
+        r = _get_httpx_client().post(
+            f"{base_url}/api/show",
+            content=_dumps({"model": model}),
+            headers=_JSON_HEADERS,
+            timeout=_http_timeout(read=5.0),
+        )
+        r.raise_for_status()
+        thinks = "thinking" in _loads(r.content).get("capabilities", [])
+    except Exception:
+        return True
+    _ollama_thinking[key] = thinks
+    return thinks
+
+
+def _ollama_payload(model: str, messages: list[dict], stream: bool, thinks: bool) -> dict:
+    """Request body for Ollama /api/chat."""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": stream,
+        "options": {
+            "temperature": settings.llm_temperature,
+            "num_predict": settings.llm_max_tokens,
+        },
+    }
+    if thinks:
+        payload["think"] = False
+    return payload
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token); no tokenizer needed."""
+    return len(text) // 4
+
+
+def _fit_prompt_budget(system_prompt: str, messages: list[dict]) -> list[dict]:
+    """Drop the oldest turns until the prompt fits llm_prompt_budget_tokens.
+
+    The latest message is always kept; if it alone with the system prompt is
+    over budget, LLMClientError is raised rather than sending it.
+    """
+    budget = settings.llm_prompt_budget_tokens
+    sizes = [_estimate_tokens(m["content"]) for m in messages]
+    total = _estimate_tokens(system_prompt) + sum(sizes)
+    start = 0
+    while total > budget and start < len(messages) - 1:
+        total -= sizes[start]
+        start += 1
+    if total > budget:
+        raise LLMClientError(f"Prompt too long (~{total} tokens, budget {budget})")
+    if start:
+        logger.info("Dropped %d oldest chat messages to fit prompt budget", start)
+        return messages[start:]
+    return messages
+
+
+@functools.lru_cache(maxsize=8)
+def _system_message(system_prompt: str) -> dict:
+    """System message dict, reused while the prompt is unchanged. Do not mutate."""
+    return {"role": "system", "content": system_prompt}
+
+
+@functools.lru_cache(maxsize=8)
+def _llamacpp_system_prefix(system_prompt: str) -> str:
+    return f"<|system|>\n{system_prompt}\n"
+
+
+def _llamacpp_prompt_parts(system_prompt: str, messages: list[dict]):
+    """Chat-template pieces for llama.cpp's raw /completion endpoint."""
+    yield _llamacpp_system_prefix(system_prompt)
+    for msg in messages:
+        yield f"<|{msg['role']}|>\n{msg['content']}\n"
+    yield "<|assistant|>\n"
+
+
+async def _aiter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the payload of each `data:` line of a server-sent event stream."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        if data:
+            yield data
+
+
+@dataclass(slots=True, frozen=True)
 class LLMResponse:
     """Successful LLM completion result."""
 
@@ -31,6 +348,52 @@ class LLMResponse:
     model: str
 
 
+# Replies to identical prompts, reused only when sampling is deterministic
+# (llm_temperature == 0). LLMResponse is frozen, so entries are shared safely.
+_RESPONSE_CACHE_SIZE = 256
+_response_cache: OrderedDict[bytes, LLMResponse] = OrderedDict()
+_response_lock = threading.Lock()
+
+_MODEL_SETTINGS = {
+    "ollama": "ollama_model",
+    "vllm": "vllm_model",
+    "claude": "anthropic_model",
+    "openai": "openai_model",
+}
+
+
+def _response_key(provider: str, system_prompt: str, messages: list[dict]) -> bytes | None:
+    """Digest of everything that determines a reply, or None if caching is off."""
+    if settings.llm_temperature != 0:
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    model = getattr(settings, _MODEL_SETTINGS.get(provider, ""), "")
+    h.update(f"{provider}\0{model}\0{settings.llm_max_tokens}\0".encode())
+    h.update(system_prompt.encode())
+    for msg in messages:
+        h.update(f"\0{msg['role']}\0{msg['content']}".encode())
+    return h.digest()
+
+
+def _cached_response(key: bytes | None) -> LLMResponse | None:
+    if key is None:
+        return None
+    with _response_lock:
+        cached = _response_cache.get(key)
+        if cached is not None:
+            _response_cache.move_to_end(key)
+        return cached
+
+
+def _store_response(key: bytes | None, response: LLMResponse) -> None:
+    if key is None:
+        return
+    with _response_lock:
+        _response_cache[key] = response
+        if len(_response_cache) > _RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
 class LLMClient:
     """Dispatches completion requests to the configured LLM provider."""
 
@@ -41,29 +404,38 @@ class LLMClient:
         """Check whether a usable LLM provider is configured."""
         return self._provider != "none"
 
-    def complete(self, system_prompt: str, user_prompt: str) -> LLMResponse:
-        """Send a completion request to the configured provider."""
-        if not self.is_available():
-            raise LLMClientError("No LLM provider configured (provider='none')")
+    def warmup(self) -> None:
+        """Open keep-alive connections to the configured providers ahead of use.
 
-        dispatch = {
-            "ollama": self._complete_ollama,
-            "llamacpp": self._complete_llamacpp,
-            "vllm": self._complete_vllm,
-            "claude": self._complete_claude,
-            "openai": self._complete_openai,
+        Issues a cheap HEAD per endpoint through the shared pool and builds the
+        Anthropic SDK client, so the first real request skips DNS/TLS setup and imports.
+        Failures are ignored — the real request will surface them.
+        """
+        if not self.is_available():
+            return
+        endpoints = {
+            "ollama": settings.ollama_base_url,
+            "llamacpp": settings.llamacpp_server_url,
+            "vllm": settings.vllm_server_url,
+            "claude": "https://api.anthropic.com",
+            "openai": settings.openai_base_url,
         }
+        client = _get_httpx_client()
+        for provider in self._provider_chain():
+            try:
+                if provider == "claude" and settings.anthropic_api_key:
+                    _get_anthropic_client(settings.anthropic_api_key)
+                elif provider == "ollama":
+                    _ollama_thinks(settings.ollama_base_url.rstrip("/"), settings.ollama_model)
+                url = endpoints.get(provider)
+                if url:
+                    client.head(url, timeout=_http_timeout(read=2.0))
+            except Exception as e:
+                logger.debug("LLM warmup for %s failed: %s", provider, e)
 
-        handler = dispatch.get(self._provider)
-        if handler is None:
-            raise LLMClientError(f"Unknown LLM provider: {self._provider}")
-
-        try:
-            return handler(system_prompt, user_prompt)
-        except LLMClientError:
-            raise
-        except Exception as e:
-            raise LLMClientError(f"{self._provider} error: {e}") from e
+    def complete(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        """Send a single-turn completion request to the configured provider."""
+        return self.chat(system_prompt, [{"role": "user", "content": user_prompt}])
 
     def chat(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
         """Send a multi-turn chat request to the configured provider.
@@ -86,235 +458,478 @@ class LLMClient:
             "openai": self._chat_openai,
         }
 
+        messages = _fit_prompt_budget(system_prompt, messages)
+        key = _response_key(self._provider, system_prompt, messages)
+        cached = _cached_response(key)
+        if cached is not None:
+            return cached
+        response = self._call_chain(dispatch, system_prompt, messages)
+        # Key names the primary; a fallback's reply must not outlive its outage
+        if response.provider == self._provider:
+            _store_response(key, response)
+        return response
+
+    async def acomplete(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        """Async counterpart of complete(); does not block the event loop."""
+        return await self.achat(system_prompt, [{"role": "user", "content": user_prompt}])
+
+    async def achat(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        """Async counterpart of chat(); does not block the event loop."""
+        if not self.is_available():
+            raise LLMClientError("No LLM provider configured (provider='none')")
+
+        dispatch = {
+            "ollama": self._achat_ollama,
+            "llamacpp": self._achat_llamacpp,
+            "vllm": self._achat_vllm,
+            "claude": self._achat_claude,
+            "openai": self._achat_openai,
+        }
+
+        messages = _fit_prompt_budget(system_prompt, messages)
+        key = _response_key(self._provider, system_prompt, messages)
+        cached = _cached_response(key)
+        if cached is not None:
+            return cached
+        response = await self._acall_chain(dispatch, system_prompt, messages)
+        if response.provider == self._provider:
+            _store_response(key, response)
+        return response
+
+    async def astream(self, system_prompt: str, messages: list[dict]) -> AsyncIterator[str]:
+        """Stream the assistant's reply as text chunks from the configured provider.
+
+        Uses the primary provider only (no retry/fallback once output has
+        started). Errors are raised as LLMClientError.
+        """
+        if not self.is_available():
+            raise LLMClientError("No LLM provider configured (provider='none')")
+
+        dispatch = {
+            "ollama": self._astream_ollama,
+            "llamacpp": self._astream_llamacpp,
+            "vllm": self._astream_vllm,
+            "claude": self._astream_claude,
+            "openai": self._astream_openai,
+        }
+
         handler = dispatch.get(self._provider)
         if handler is None:
             raise LLMClientError(f"Unknown LLM provider: {self._provider}")
+        messages = _fit_prompt_budget(system_prompt, messages)
 
+        think_filter = self._stream_think_filter()
         try:
-            return handler(system_prompt, messages)
+            async for chunk in handler(system_prompt, messages):
+                if chunk and think_filter is not None:
+                    chunk = think_filter.feed(chunk)
+                if chunk:
+                    yield chunk
+            if think_filter is not None:
+                tail = think_filter.flush()
+                if tail:
+                    yield tail
         except LLMClientError:
             raise
         except Exception as e:
             raise LLMClientError(f"{self._provider} error: {e}") from e
 
-    # ── Provider implementations ─────────────────────────────────────────
-
-    def _complete_ollama(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+    def _stream_think_filter(self) -> "_ThinkFilter | None":
+        """Filter for <think> blocks when the provider may emit them (as chat() strips them)."""
+        if self._provider == "llamacpp":
+            return _ThinkFilter()
+        if self._provider == "ollama":
+            key = (settings.ollama_base_url.rstrip("/"), settings.ollama_model)
+            if _ollama_thinking.get(key, True):
+                return _ThinkFilter()
+        return None
+
+    def _provider_chain(self) -> list[str]:
+        """Configured provider first, then any distinct fallbacks in order."""
+        chain = [self._provider]
+        for name in settings.llm_fallback_chain:
+            name = name.lower()
+            if name != "none" and name not in chain:
+                chain.append(name)
+        return chain
+
+    @staticmethod
+    def _read_timeout_for(index: int, chain: list[str]) -> float | None:
+        """Shorter read budget for the first provider when fallbacks can take over."""
+        if index == 0 and len(chain) > 1:
+            return settings.llm_first_attempt_timeout
+        return None
+
+    def _call_chain(self, dispatch: dict, *args) -> LLMResponse:
+        """Try each provider in the chain until one succeeds.
+
+        Providers with an open circuit are skipped; the combined error is
+        raised only when every provider has failed or been skipped.
+        """
+        errors: list[str] = []
+        chain = self._provider_chain()
+        for i, provider in enumerate(chain):
+            handler = dispatch.get(provider)
+            if handler is None:
+                errors.append(f"Unknown LLM provider: {provider}")
+                continue
+            if _circuit_open(provider):
+                errors.append(f"{provider} skipped (circuit open)")
+                continue
+            token = _read_timeout.set(self._read_timeout_for(i, chain))
+            try:
+                response = self._call_with_retry(provider, handler, *args)
+            except LLMClientError as e:
+                _record_failure(provider)
+                errors.append(str(e))
+                continue
+            finally:
+                _read_timeout.reset(token)
+            _record_success(provider)
+            if provider != self._provider:
+                logger.info("LLM request served by fallback provider %s", provider)
+            return response
+        raise LLMClientError("; ".join(errors))
+
+    async def _acall_chain(self, dispatch: dict, *args) -> LLMResponse:
+        """Async counterpart of _call_chain(), optionally hedging the first two providers."""
+        errors: list[str] = []
+        chain = self._provider_chain()
+        usable: list[str] = []
+        for provider in chain:
+            if dispatch.get(provider) is None:
+                errors.append(f"Unknown LLM provider: {provider}")
+            elif _circuit_open(provider):
+                errors.append(f"{provider} skipped (circuit open)")
+            else:
+                usable.append(provider)
+
+        if settings.llm_enable_hedging and len(usable) > 1:
+            hedged, usable = usable[:2], usable[2:]
+            response = await self._ahedge(dispatch, chain, hedged, errors, *args)
+            if response is not None:
+                return response
+
+        for provider in usable:
+            try:
+                return await self._aattempt(dispatch, chain, provider, *args)
+            except LLMClientError as e:
+                errors.append(str(e))
+        raise LLMClientError("; ".join(errors))
+
+    async def _aattempt(self, dispatch: dict, chain: list[str], provider: str, *args) -> LLMResponse:
+        """One provider's turn in the chain: retries, timeouts and circuit bookkeeping."""
+        token = _read_timeout.set(self._read_timeout_for(chain.index(provider), chain))
+        try:
+            response = await self._acall_with_retry(provider, dispatch[provider], *args)
+        except LLMClientError:
+            _record_failure(provider)
+            raise
+        finally:
+            _read_timeout.reset(token)
+        _record_success(provider)
+        if provider != self._provider:
+            logger.info("LLM request served by fallback provider %s", provider)
+        return response
+
+    async def _ahedge(self, dispatch: dict, chain: list[str], providers: list[str],
+                      errors: list[str], *args) -> LLMResponse | None:
+        """Race the primary against a second provider started after llm_hedge_delay_seconds.
+
+        Returns the first successful reply (cancelling the other request), or
+        None with both failures appended to errors.
+        """
+        primary, secondary = providers
+        first = asyncio.create_task(self._aattempt(dispatch, chain, primary, *args))
+        done, tasks = await asyncio.wait({first}, timeout=settings.llm_hedge_delay_seconds)
+        if done:
+            try:
+                return first.result()
+            except LLMClientError as e:
+                errors.append(str(e))
+        else:
+            logger.info("LLM provider %s slow; hedging with %s", primary, secondary)
+        tasks.add(asyncio.create_task(self._aattempt(dispatch, chain, secondary, *args)))
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        return task.result()
+                    except LLMClientError as e:
+                        errors.append(str(e))
+        finally:
+            for task in tasks:
+                task.cancel()
+        return None
+
+    def _call_with_retry(self, provider: str, handler, *args) -> LLMResponse:
+        """Invoke a provider handler, retrying transient failures with backoff."""
+        attempts = max(1, settings.llm_max_attempts)
+        for attempt in range(attempts):
+            try:
+                return handler(*args)
+            except LLMClientError:
+                raise
+            except Exception as e:
+                if attempt + 1 < attempts and _is_retryable(e):
+                    time.sleep(_backoff_delay(attempt))
+                    continue
+                raise LLMClientError(f"{provider} error: {e}") from e
+
+    async def _acall_with_retry(self, provider: str, handler, *args) -> LLMResponse:
+        """Async counterpart of _call_with_retry()."""
+        attempts = max(1, settings.llm_max_attempts)
+        for attempt in range(attempts):
+            try:
+                return await handler(*args)
+            except LLMClientError:
+                raise
+            except Exception as e:
+                if attempt + 1 < attempts and _is_retryable(e):
+                    await asyncio.sleep(_backoff_delay(attempt))
+                    continue
+                raise LLMClientError(f"{provider} error: {e}") from e
+
+    # ── Request builders (shared by sync, async and streaming paths) ───
+
+    @staticmethod
+    def _ollama_request(system_prompt: str, messages: list[dict], *,
+                        stream: bool, thinks: bool) -> tuple[str, bytes, dict]:
         base_url = settings.ollama_base_url.rstrip("/")
-        model = settings.ollama_model
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            r = client.post(
-                f"{base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    "stream": False,
-                    "think": False,
-                    "options": {
-                        "temperature": settings.llm_temperature,
-                        "num_predict": settings.llm_max_tokens,
-                    },
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            text = _strip_thinking(data.get("message", {}).get("content", ""))
-            return LLMResponse(text=text, provider="ollama", model=model)
+        all_messages = [_system_message(system_prompt), *messages]
+        payload = _ollama_payload(settings.ollama_model, all_messages, stream, thinks)
+        return f"{base_url}/api/chat", _dumps(payload), _JSON_HEADERS
 
-    def _complete_llamacpp(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+    @staticmethod
+    def _llamacpp_request(system_prompt: str, messages: list[dict], *,
+                          stream: bool) -> tuple[str, bytes, dict]:
         server_url = settings.llamacpp_server_url.rstrip("/")
-        prompt = f"<|system|>\n{system_prompt}\n<|user|>\n{user_prompt}\n<|assistant|>\n"
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            r = client.post(
-                f"{server_url}/completion",
-                json={
-                    "prompt": prompt,
-                    "temperature": settings.llm_temperature,
-                    "n_predict": settings.llm_max_tokens,
-                    "stop": ["<|user|>", "<|system|>"],
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            text = _strip_thinking(data.get("content", ""))
-            return LLMResponse(text=text, provider="llamacpp", model="local")
-
-    def _complete_vllm(self, system_prompt: str, user_prompt: str) -> LLMResponse:
-        server_url = settings.vllm_server_url.rstrip("/")
-        model = settings.vllm_model
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            r = client.post(
-                f"{server_url}/v1/chat/completions",
-                json={
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    "temperature": settings.llm_temperature,
-                    "max_tokens": settings.llm_max_tokens,
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            text = data["choices"][0]["message"]["content"]
-            return LLMResponse(text=text, provider="vllm", model=model)
+        payload = {
+            "prompt": "".join(_llamacpp_prompt_parts(system_prompt, messages)),
+            "temperature": settings.llm_temperature,
+            "n_predict": settings.llm_max_tokens,
+            "stop": ["<|user|>", "<|system|>"],
+        }
+        if stream:
+            payload["stream"] = True
+        return f"{server_url}/completion", _dumps(payload), _JSON_HEADERS
+
+    @staticmethod
+    def _openai_compatible_request(base_url: str, model: str, api_key: str | None,
+                                   system_prompt: str, messages: list[dict], *,
+                                   stream: bool) -> tuple[str, bytes, dict]:
+        """Request for any /v1/chat/completions server (vLLM, OpenAI)."""
+        payload = {
+            "model": model,
+            "messages": [_system_message(system_prompt), *messages],
+            "temperature": settings.llm_temperature,
+            "max_tokens": settings.llm_max_tokens,
+        }
+        if stream:
+            payload["stream"] = True
+        headers = _JSON_HEADERS
+        if api_key:
+            headers = {**_JSON_HEADERS, "authorization": f"Bearer {api_key}"}
+        return f"{base_url.rstrip('/')}/v1/chat/completions", _dumps(payload), headers
+
+    def _vllm_request(self, system_prompt: str, messages: list[dict], *,
+                      stream: bool) -> tuple[str, bytes, dict]:
+        return self._openai_compatible_request(
+            settings.vllm_server_url, settings.vllm_model, None,
+            system_prompt, messages, stream=stream,
+        )
+
+    def _openai_request(self, system_prompt: str, messages: list[dict], *,
+                        stream: bool) -> tuple[str, bytes, dict]:
+        api_key = settings.openai_api_key
+        if not api_key:
+            raise LLMClientError("WHOP_OPENAI_API_KEY not set")
+        url, body, headers = self._openai_compatible_request(
+            settings.openai_base_url, settings.openai_model, api_key,
+            system_prompt, messages, stream=stream,
+        )
+        if settings.openai_organization:
+            headers = {**headers, "openai-organization": settings.openai_organization}
+        return url, body, headers
+
+    @staticmethod
+    def _post(url: str, body: bytes, headers: dict) -> dict:
+        r = _get_httpx_client().post(url, content=body, headers=headers, timeout=_attempt_timeout())
+        r.raise_for_status()
+        return _loads(r.content)
+
+    @staticmethod
+    async def _apost(url: str, body: bytes, headers: dict) -> dict:
+        r = await _get_async_httpx_client().post(
+            url, content=body, headers=headers, timeout=_attempt_timeout(),
+        )
+        r.raise_for_status()
+        return _loads(r.content)
 
-    def _complete_claude(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+    # ── Response parsers ──────────────────────────────────────────────────
+
+    @staticmethod
+    def _ollama_response(data: dict, thinks: bool) -> LLMResponse:
+        try:
+            text = data["message"]["content"]
+        except (KeyError, TypeError):
+            text = ""
+        text = _strip_thinking(text) if thinks else text.strip()
+        return LLMResponse(text=text, provider="ollama", model=settings.ollama_model)
+
+    @staticmethod
+    def _llamacpp_response(data: dict) -> LLMResponse:
         try:
-            import anthropic
-        except ImportError:
-            raise LLMClientError("anthropic package not installed (pip install anthropic)")
+            text = _strip_thinking(data["content"])
+        except (KeyError, TypeError):
+            text = ""
+        return LLMResponse(text=text, provider="llamacpp", model="local")
+
+    @staticmethod
+    def _openai_compatible_response(data: dict, provider: str, model: str) -> LLMResponse:
+        text = data["choices"][0]["message"]["content"] or ""
+        return LLMResponse(text=text, provider=provider, model=model)
+
+    # ── Multi-turn chat implementations ───────────────────────────────────
+
+    def _chat_ollama(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        thinks = _ollama_thinks(settings.ollama_base_url.rstrip("/"), settings.ollama_model)
+        request = self._ollama_request(system_prompt, messages, stream=False, thinks=thinks)
+        data = self._post(*request)
+        return self._ollama_response(data, thinks)
+
+    def _chat_llamacpp(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        data = self._post(*self._llamacpp_request(system_prompt, messages, stream=False))
+        return self._llamacpp_response(data)
+
+    def _chat_vllm(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        data = self._post(*self._vllm_request(system_prompt, messages, stream=False))
+        return self._openai_compatible_response(data, "vllm", settings.vllm_model)
 
+    def _chat_claude(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
         api_key = settings.anthropic_api_key
         if not api_key:
             raise LLMClientError("WHOP_ANTHROPIC_API_KEY not set")
 
         model = settings.anthropic_model
-        client = anthropic.Anthropic(api_key=api_key)
+        client = _get_anthropic_client(api_key)
         message = client.messages.create(
             model=model,
             max_tokens=settings.llm_max_tokens,
             system=system_prompt,
-            messages=[{"role": "user", "content": user_prompt}],
+            messages=messages,
             temperature=settings.llm_temperature,
+            timeout=_attempt_timeout(),
         )
         text = message.content[0].text
         return LLMResponse(text=text, provider="claude", model=model)
 
-    def _complete_openai(self, system_prompt: str, user_prompt: str) -> LLMResponse:
-        try:
-            import openai
-        except ImportError:
-            raise LLMClientError("openai package not installed (pip install openai)")
-
-        api_key = settings.openai_api_key
-        if not api_key:
-            raise LLMClientError("WHOP_OPENAI_API_KEY not set")
-
-        model = settings.openai_model
-        client = openai.OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=settings.llm_temperature,
-            max_tokens=settings.llm_max_tokens,
-        )
-        text = response.choices[0].message.content
-        return LLMResponse(text=text, provider="openai", model=model)
-
-    # ── Multi-turn chat implementations ───────────────────────────────────
+    def _chat_openai(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        data = self._post(*self._openai_request(system_prompt, messages, stream=False))
+        return self._openai_compatible_response(data, "openai", settings.openai_model)
 
-    def _chat_ollama(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
-        base_url = settings.ollama_base_url.rstrip("/")
-        model = settings.ollama_model
-        all_messages = [{"role": "system", "content": system_prompt}] + messages
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            r = client.post(
-                f"{base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": all_messages,
-                    "stream": False,
-                    "think": False,
-                    "options": {
-                        "temperature": settings.llm_temperature,
-                        "num_predict": settings.llm_max_tokens,
-                    },
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            text = _strip_thinking(data.get("message", {}).get("content", ""))
-            return LLMResponse(text=text, provider="ollama", model=model)
+    # ── Async chat implementations ────────────────────────────────────────
 
-    def _chat_llamacpp(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
-        server_url = settings.llamacpp_server_url.rstrip("/")
-        parts = [f"<|system|>\n{system_prompt}"]
-        for msg in messages:
-            parts.append(f"<|{msg['role']}|>\n{msg['content']}")
-        parts.append("<|assistant|>\n")
-        prompt = "\n".join(parts)
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            r = client.post(
-                f"{server_url}/completion",
-                json={
-                    "prompt": prompt,
-                    "temperature": settings.llm_temperature,
-                    "n_predict": settings.llm_max_tokens,
-                    "stop": ["<|user|>", "<|system|>"],
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            text = data.get("content", "")
-            return LLMResponse(text=text, provider="llamacpp", model="local")
+    async def _achat_ollama(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        # Capability is probed during warmup; don't block the event loop on it
+        key = (settings.ollama_base_url.rstrip("/"), settings.ollama_model)
+        thinks = _ollama_thinking.get(key, True)
+        request = self._ollama_request(system_prompt, messages, stream=False, thinks=thinks)
+        data = await self._apost(*request)
+        return self._ollama_response(data, thinks)
 
-    def _chat_vllm(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
-        server_url = settings.vllm_server_url.rstrip("/")
-        model = settings.vllm_model
-        all_messages = [{"role": "system", "content": system_prompt}] + messages
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            r = client.post(
-                f"{server_url}/v1/chat/completions",
-                json={
-                    "model": model,
-                    "messages": all_messages,
-                    "temperature": settings.llm_temperature,
-                    "max_tokens": settings.llm_max_tokens,
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            text = data["choices"][0]["message"]["content"]
-            return LLMResponse(text=text, provider="vllm", model=model)
+    async def _achat_llamacpp(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        data = await self._apost(*self._llamacpp_request(system_prompt, messages, stream=False))
+        return self._llamacpp_response(data)
 
-    def _chat_claude(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
-        try:
-            import anthropic
-        except ImportError:
-            raise LLMClientError("anthropic package not installed (pip install anthropic)")
+    async def _achat_vllm(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        data = await self._apost(*self._vllm_request(system_prompt, messages, stream=False))
+        return self._openai_compatible_response(data, "vllm", settings.vllm_model)
 
+    async def _achat_claude(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
         api_key = settings.anthropic_api_key
         if not api_key:
             raise LLMClientError("WHOP_ANTHROPIC_API_KEY not set")
 
         model = settings.anthropic_model
-        client = anthropic.Anthropic(api_key=api_key)
-        message = client.messages.create(
+        client = _get_async_anthropic_client(api_key)
+        message = await client.messages.create(
             model=model,
             max_tokens=settings.llm_max_tokens,
             system=system_prompt,
             messages=messages,
             temperature=settings.llm_temperature,
+            timeout=_attempt_timeout(),
         )
         text = message.content[0].text
         return LLMResponse(text=text, provider="claude", model=model)
 
-    def _chat_openai(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
-        try:
-            import openai
-        except ImportError:
-            raise LLMClientError("openai package not installed (pip install openai)")
+    async def _achat_openai(self, system_prompt: str, messages: list[dict]) -> LLMResponse:
+        data = await self._apost(*self._openai_request(system_prompt, messages, stream=False))
+        return self._openai_compatible_response(data, "openai", settings.openai_model)
 
-        api_key = settings.openai_api_key
+    # ── Streaming implementations ─────────────────────────────────────────
+
+    async def _astream_ollama(self, system_prompt: str, messages: list[dict]) -> AsyncIterator[str]:
+        key = (settings.ollama_base_url.rstrip("/"), settings.ollama_model)
+        url, body, headers = self._ollama_request(
+            system_prompt, messages, stream=True, thinks=_ollama_thinking.get(key, True),
+        )
+        client = _get_async_httpx_client()
+        async with client.stream("POST", url, content=body, headers=headers,
+                                 timeout=_attempt_timeout()) as r:
+            r.raise_for_status()
+            # NDJSON: one {"message": {"content": ...}, "done": ...} object per line
+            async for line in r.aiter_lines():
+                if line:
+                    try:
+                        yield _loads(line)["message"]["content"]
+                    except (KeyError, TypeError):
+                        continue
+
+    async def _astream_llamacpp(self, system_prompt: str, messages: list[dict]) -> AsyncIterator[str]:
+        url, body, headers = self._llamacpp_request(system_prompt, messages, stream=True)
+        client = _get_async_httpx_client()
+        async with client.stream("POST", url, content=body, headers=headers,
+                                 timeout=_attempt_timeout()) as r:
+            r.raise_for_status()
+            async for data in _aiter_sse_data(r):
+                yield _loads(data).get("content", "")
+
+    async def _astream_openai_compatible(self, request: tuple) -> AsyncIterator[str]:
+        url, body, headers = request
+        client = _get_async_httpx_client()
+        async with client.stream("POST", url, content=body, headers=headers,
+                                 timeout=_attempt_timeout()) as r:
+            r.raise_for_status()
+            async for data in _aiter_sse_data(r):
+                choices = _loads(data).get("choices") or [{}]
+                yield choices[0].get("delta", {}).get("content") or ""
+
+    def _astream_vllm(self, system_prompt: str, messages: list[dict]) -> AsyncIterator[str]:
+        return self._astream_openai_compatible(
+            self._vllm_request(system_prompt, messages, stream=True),
+        )
+
+    async def _astream_claude(self, system_prompt: str, messages: list[dict]) -> AsyncIterator[str]:
+        api_key = settings.anthropic_api_key
         if not api_key:
-            raise LLMClientError("WHOP_OPENAI_API_KEY not set")
+            raise LLMClientError("WHOP_ANTHROPIC_API_KEY not set")
 
-        model = settings.openai_model
-        all_messages = [{"role": "system", "content": system_prompt}] + messages
-        client = openai.OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model=model,
-            messages=all_messages,
-            temperature=settings.llm_temperature,
+        client = _get_async_anthropic_client(api_key)
+        async with client.messages.stream(
+            model=settings.anthropic_model,
             max_tokens=settings.llm_max_tokens,
+            system=system_prompt,
+            messages=messages,
+            temperature=settings.llm_temperature,
+            timeout=_attempt_timeout(),
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    def _astream_openai(self, system_prompt: str, messages: list[dict]) -> AsyncIterator[str]:
+        return self._astream_openai_compatible(
+            self._openai_request(system_prompt, messages, stream=True),
         )
-        text = response.choices[0].message.content
-        return LLMResponse(text=text, provider="openai", model=model)
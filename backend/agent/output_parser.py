@@ -5,6 +5,7 @@ commas. Falls back to optimizer results when parsing fails.
 """
 
 import json
+import math
 import re
 from dataclasses import dataclass, field
 
@@ -15,6 +16,24 @@ from models.actions import (
 )
 from models.recommendations import ScoredCandidate
 
+_DECODER = json.JSONDecoder()
+_STRUCTURAL_RE = re.compile(r'[{}"\\]')
+_BRACE_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Department names/abbreviations an LLM may use, lowercased
+_DEPT_MAP: dict[str, DepartmentId] = {
+    "er": DepartmentId.ER,
+    "emergency": DepartmentId.ER,
+    "surgery": DepartmentId.SURGERY,
+    "surg": DepartmentId.SURGERY,
+    "cc": DepartmentId.CRITICAL_CARE,
+    "critical_care": DepartmentId.CRITICAL_CARE,
+    "critical care": DepartmentId.CRITICAL_CARE,
+    "sd": DepartmentId.STEP_DOWN,
+    "step_down": DepartmentId.STEP_DOWN,
+    "step down": DepartmentId.STEP_DOWN,
+}
+
 
 class ParseError(Exception):
     """Raised when LLM output cannot be parsed into a valid action."""
@@ -51,14 +70,7 @@ def parse_llm_response(raw_text: str, step: StepType) -> ParsedRecommendation:
 
     action_data = data.get("action", data)
 
-    parsers = {
-        StepType.ARRIVALS: _parse_arrivals_action,
-        StepType.EXITS: _parse_exits_action,
-        StepType.CLOSED: _parse_closed_action,
-        StepType.STAFFING: _parse_staffing_action,
-    }
-
-    parser = parsers.get(step)
+    parser = _STEP_PARSERS.get(step)
     if parser is None:
         raise ParseError(f"No parser for step type: {step}")
 
@@ -88,30 +100,70 @@ def parse_llm_response(raw_text: str, step: StepType) -> ParsedRecommendation:
     )
 
 
+def _find_json_span(text: str, pos: int = 0) -> tuple[int, int] | None:
+    """Locate the first balanced {...} object at or after pos in one pass.
+
+    Jumps between structural characters (braces, quotes, backslashes) and
+    tracks string/escape state, so braces inside JSON strings don't count.
+    Returns (start, end) suitable for slicing, or None.
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = -1
+    for m in _STRUCTURAL_RE.finditer(text, pos):
+        i = m.start()
+        if i == escaped:
+            continue
+        c = text[i]
+        if c == "\\":
+            if in_string:
+                escaped = i + 1
+        elif c == '"':
+            if depth:
+                in_string = not in_string
+        elif in_string:
+            continue
+        elif c == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif depth:
+            depth -= 1
+            if depth == 0:
+                return start, i + 1
+    return None
+
+
 def _extract_json(raw_text: str) -> dict:
-    """Try multiple strategies to extract JSON from LLM output."""
+    """Extract the first JSON object from LLM output (bare, fenced, or with preamble)."""
     text = raw_text.strip()
 
-    # Strategy 1: Direct JSON parse
+    # Fast path: the first "{" starts the object (bare JSON, or a brace-free
+    # preamble/fence around it); raw_decode ignores whatever follows it.
+    first = text.find("{")
+    if first < 0:
+        raise ParseError("Could not extract valid JSON from LLM output")
     try:
-        result = json.loads(text)
+        result, _ = _DECODER.raw_decode(text, first)
         if isinstance(result, dict):
             return result
     except json.JSONDecodeError:
         pass
 
-    # Strategy 2: Extract from code fence
-    fence_match = re.search(r"```(?:json)?\s*\n?(.*?)\n?\s*```", text, re.DOTALL)
-    if fence_match:
+    pos = first + 1
+    while (span := _find_json_span(text, pos)) is not None:
+        start, end = span
         try:
-            result = json.loads(fence_match.group(1).strip())
+            result = json.loads(text[start:end])
             if isinstance(result, dict):
                 return result
         except json.JSONDecodeError:
             pass
+        pos = start + 1
 
-    # Strategy 3: Find first { ... } block
-    brace_match = re.search(r"\{.*\}", text, re.DOTALL)
+    # Last resort for unbalanced output: first "{" to last "}"
+    brace_match = _BRACE_RE.search(text)
     if brace_match:
         try:
             result = json.loads(brace_match.group(0))
@@ -125,48 +177,75 @@ def _extract_json(raw_text: str) -> dict:
 
 def _parse_dept_id(value: str) -> DepartmentId:
     """Convert a string to DepartmentId, handling common variations."""
-    mapping = {
-        "er": DepartmentId.ER,
-        "emergency": DepartmentId.ER,
-        "surgery": DepartmentId.SURGERY,
-        "surg": DepartmentId.SURGERY,
-        "cc": DepartmentId.CRITICAL_CARE,
-        "critical_care": DepartmentId.CRITICAL_CARE,
-        "critical care": DepartmentId.CRITICAL_CARE,
-        "sd": DepartmentId.STEP_DOWN,
-        "step_down": DepartmentId.STEP_DOWN,
-        "step down": DepartmentId.STEP_DOWN,
-    }
-    result = mapping.get(value.lower().strip())
+    if isinstance(value, DepartmentId):
+        return value
+    result = _DEPT_MAP.get(value.strip().lower())
     if result is None:
         raise ParseError(f"Unknown department: {value}")
     return result
 
 
+def _dept_or_none(value) -> DepartmentId | None:
+    """Non-raising _parse_dept_id() for the per-item parsers."""
+    if isinstance(value, DepartmentId):
+        return value
+    return _DEPT_MAP.get(str(value).strip().lower())
+
+
+_INT_RE = re.compile(r"[+-]?[0-9]+")
+
+
+def _safe_int(value) -> int | None:
+    """int(value) for ints, floats and digit strings; None for anything else."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if math.isfinite(value) else None
+    if isinstance(value, str):
+        value = value.strip()
+        if _INT_RE.fullmatch(value):
+            return int(value)
+    return None
+
+
+def _dept_counts(raw) -> dict[DepartmentId, int]:
+    """Parse a {department: count} mapping, skipping unusable entries."""
+    counts = {}
+    if isinstance(raw, dict):
+        for dept_str, count in raw.items():
+            dept = _dept_or_none(dept_str)
+            n = _safe_int(count)
+            if dept is not None and n is not None:
+                counts[dept] = n
+    return counts
+
+
+def _dict_items(data: dict, key: str) -> list[dict]:
+    """The dict entries of a list field, ignoring a non-list value or non-dict items."""
+    items = data.get(key, [])
+    if not isinstance(items, list):
+        return []
+    return [item for item in items if isinstance(item, dict)]
+
+
 def _parse_arrivals_action(data: dict) -> ArrivalsAction:
     """Parse arrivals action, skipping invalid items leniently."""
     admissions = []
-    for item in data.get("admissions", []):
-        try:
-            dept = _parse_dept_id(str(item.get("department", "")))
-            count = int(item.get("admit_count", 0))
-            if count > 0:
-                admissions.append(AdmitDecision(department=dept, admit_count=count))
-        except (ParseError, ValueError, TypeError):
-            continue
+    for item in _dict_items(data, "admissions"):
+        dept = _dept_or_none(item.get("department", ""))
+        count = _safe_int(item.get("admit_count", 0))
+        if dept is not None and count is not None and count > 0:
+            admissions.append(AdmitDecision(department=dept, admit_count=count))
 
     accepts = []
-    for item in data.get("transfer_accepts", []):
-        try:
-            dept = _parse_dept_id(str(item.get("department", "")))
-            from_dept = _parse_dept_id(str(item.get("from_dept", "")))
-            count = int(item.get("accept_count", 0))
-            if count > 0:
-                accepts.append(AcceptTransferDecision(
-                    department=dept, from_dept=from_dept, accept_count=count
-                ))
-        except (ParseError, ValueError, TypeError):
-            continue
+    for item in _dict_items(data, "transfer_accepts"):
+        dept = _dept_or_none(item.get("department", ""))
+        from_dept = _dept_or_none(item.get("from_dept", ""))
+        count = _safe_int(item.get("accept_count", 0))
+        if dept is not None and from_dept is not None and count is not None and count > 0:
+            accepts.append(AcceptTransferDecision(
+                department=dept, from_dept=from_dept, accept_count=count
+            ))
 
     return ArrivalsAction(admissions=admissions, transfer_accepts=accepts)
 
@@ -174,41 +253,30 @@ def _parse_arrivals_action(data: dict) -> ArrivalsAction:
 def _parse_exits_action(data: dict) -> ExitsAction:
     """Parse exits action."""
     routings = []
-    for item in data.get("routings", []):
-        try:
-            from_dept = _parse_dept_id(str(item.get("from_dept", "")))
-            walkout = int(item.get("walkout_count", 0))
-            transfers = {}
-            for dest_str, count in item.get("transfers", {}).items():
-                try:
-                    dest = _parse_dept_id(dest_str)
-                    transfers[dest] = int(count)
-                except (ParseError, ValueError):
-                    continue
-            routings.append(ExitRouting(
-                from_dept=from_dept, walkout_count=walkout, transfers=transfers
-            ))
-        except (ParseError, ValueError, TypeError):
+    for item in _dict_items(data, "routings"):
+        from_dept = _dept_or_none(item.get("from_dept", ""))
+        walkout = _safe_int(item.get("walkout_count", 0))
+        if from_dept is None or walkout is None:
             continue
+        routings.append(ExitRouting(
+            from_dept=from_dept,
+            walkout_count=walkout,
+            transfers=_dept_counts(item.get("transfers", {})),
+        ))
 
     return ExitsAction(routings=routings)
 
 
 def _parse_closed_action(data: dict) -> ClosedAction:
     """Parse closed/divert action."""
-    close_depts = []
-    for dept_str in data.get("close_departments", []):
-        try:
-            close_depts.append(_parse_dept_id(str(dept_str)))
-        except ParseError:
-            continue
-
-    open_depts = []
-    for dept_str in data.get("open_departments", []):
-        try:
-            open_depts.append(_parse_dept_id(str(dept_str)))
-        except ParseError:
-            continue
+    close_depts = [
+        dept for dept in map(_dept_or_none, data.get("close_departments", []))
+        if dept is not None
+    ]
+    open_depts = [
+        dept for dept in map(_dept_or_none, data.get("open_departments", []))
+        if dept is not None
+    ]
 
     divert = bool(data.get("divert_er", False))
 
@@ -221,63 +289,49 @@ def _parse_closed_action(data: dict) -> ClosedAction:
 
 def _parse_staffing_action(data: dict) -> StaffingAction:
     """Parse staffing action."""
-    extra_staff = {}
-    raw_extra = data.get("extra_staff", {})
-    if isinstance(raw_extra, dict):
-        for dept_str, count in raw_extra.items():
-            try:
-                dept = _parse_dept_id(dept_str)
-                extra_staff[dept] = int(count)
-            except (ParseError, ValueError):
-                continue
-
-    return_extra = {}
-    raw_return = data.get("return_extra", {})
-    if isinstance(raw_return, dict):
-        for dept_str, count in raw_return.items():
-            try:
-                dept = _parse_dept_id(dept_str)
-                return_extra[dept] = int(count)
-            except (ParseError, ValueError):
-                continue
-
     transfers = []
-    raw_transfers = data.get("transfers", [])
-    if isinstance(raw_transfers, list):
-        for item in raw_transfers:
-            try:
-                if not isinstance(item, dict):
-                    continue
-                transfers.append(StaffTransfer(
-                    from_dept=_parse_dept_id(str(item.get("from_dept", ""))),
-                    to_dept=_parse_dept_id(str(item.get("to_dept", ""))),
-                    count=int(item.get("count", 1)),
-                ))
-            except (ParseError, ValueError, TypeError, AttributeError):
-                continue
+    for item in _dict_items(data, "transfers"):
+        from_dept = _dept_or_none(item.get("from_dept", ""))
+        to_dept = _dept_or_none(item.get("to_dept", ""))
+        count = _safe_int(item.get("count", 1))
+        if from_dept is not None and to_dept is not None and count is not None:
+            transfers.append(StaffTransfer(from_dept=from_dept, to_dept=to_dept, count=count))
 
     return StaffingAction(
-        extra_staff=extra_staff,
-        return_extra=return_extra,
+        extra_staff=_dept_counts(data.get("extra_staff", {})),
+        return_extra=_dept_counts(data.get("return_extra", {})),
         transfers=transfers,
     )
 
 
+# Step -> parser for the LLM's action object
+_STEP_PARSERS = {
+    StepType.ARRIVALS: _parse_arrivals_action,
+    StepType.EXITS: _parse_exits_action,
+    StepType.CLOSED: _parse_closed_action,
+    StepType.STAFFING: _parse_staffing_action,
+}
+
+# Step -> action model, for rebuilding optimizer candidates and no-op fallbacks
+_ACTION_TYPES = {
+    StepType.ARRIVALS: ArrivalsAction,
+    StepType.EXITS: ExitsAction,
+    StepType.CLOSED: ClosedAction,
+    StepType.STAFFING: StaffingAction,
+}
+
+
 def build_fallback_recommendation(
     candidates: list[ScoredCandidate],
     step: StepType,
 ) -> ParsedRecommendation:
     """Build a recommendation from the optimizer's top candidate."""
+    action_type = _ACTION_TYPES.get(step, ArrivalsAction)
+
     if not candidates:
         # Return a no-op action for the step
-        noop_actions = {
-            StepType.ARRIVALS: ArrivalsAction(),
-            StepType.EXITS: ExitsAction(),
-            StepType.CLOSED: ClosedAction(),
-            StepType.STAFFING: StaffingAction(),
-        }
         return ParsedRecommendation(
-            action=noop_actions.get(step, ArrivalsAction()),
+            action=action_type(),
             reasoning="No candidates available; recommending no action.",
             confidence=0.0,
         )
@@ -285,23 +339,13 @@ def build_fallback_recommendation(
     top = candidates[0]
 
     # Reconstruct the action from the serialized dict
-    parsers = {
-        StepType.ARRIVALS: lambda d: ArrivalsAction(**d),
-        StepType.EXITS: lambda d: ExitsAction(**d),
-        StepType.CLOSED: lambda d: ClosedAction(**d),
-        StepType.STAFFING: lambda d: StaffingAction(**d),
-    }
-
-    parser = parsers.get(step)
-    if parser is None:
+    if step not in _ACTION_TYPES:
         action = ArrivalsAction()
     else:
         try:
-            action = parser(top.action)
+            action = action_type(**top.action)
         except Exception:
-            action = parsers.get(step, lambda d: ArrivalsAction())(  # type: ignore
-                {}
-            )
+            action = action_type()
 
     alternatives = [c.description for c in candidates[1:3]]
 
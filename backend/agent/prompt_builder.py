@@ -4,10 +4,13 @@ Assembles current situation, department status, upcoming cards, bottleneck
 risks, optimizer candidates, and the required JSON output schema.
 """
 
+import threading
+from collections import OrderedDict
+
 from models.enums import DepartmentId, StepType, EVENT_ROUNDS
 from models.game_state import GameState
 from models.recommendations import OptimizationResult
-from data.card_sequences import get_arrivals, get_exits, get_er_ambulance
+from data.card_sequences import get_er_ambulance, get_er_ambulance_window, get_schedule_window
 from forecast.metrics import bottleneck_detection
 
 SYSTEM_PROMPT = """\
@@ -51,6 +54,44 @@ no code fences, no explanation outside the JSON.\
 """
 
 
+# Display labels ("ER", "SURGERY", ...), in DepartmentId order
+_DEPT_UPPER = {dept_id: dept_id.value.upper() for dept_id in DepartmentId}
+
+# Small LRU of built user prompts: retried recommendations for an unchanged
+# state and optimizer result reuse the formatted markdown.
+_PROMPT_CACHE_SIZE = 64
+_prompt_cache: OrderedDict[tuple, str] = OrderedDict()
+_prompt_lock = threading.Lock()
+
+
+def _state_key(state: GameState) -> tuple:
+    """Cheap fingerprint of everything the prompt/context formatters read."""
+    depts = tuple(
+        (
+            dept_id, dept.total_patients, dept.patients_in_beds, dept.bed_capacity,
+            dept.arrivals_waiting, dept.total_requests_waiting, dept.staff.total_idle,
+            dept.staff.total_on_duty, dept.staff.extra_total, dept.staff.extra_idle,
+            dept.is_closed, dept.is_diverting,
+        )
+        for dept_id, dept in state.departments.items()
+    )
+    return (
+        state.game_id, state.round_number, state.current_step,
+        state.total_financial_cost, state.total_quality_cost, depts,
+    )
+
+
+def _optimization_key(optimization: OptimizationResult) -> tuple:
+    return (
+        optimization.baseline_cost,
+        tuple(
+            (c.description, c.reasoning, c.expected_total, c.delta_vs_baseline,
+             c.p10_total, c.p90_total)
+            for c in optimization.candidates
+        ),
+    )
+
+
 def build_user_prompt(
     state: GameState,
     step: StepType,
@@ -58,6 +99,13 @@ def build_user_prompt(
     horizon: int,
 ) -> str:
     """Assemble the full user prompt for the LLM."""
+    key = (_state_key(state), step, _optimization_key(optimization), horizon)
+    with _prompt_lock:
+        cached = _prompt_cache.get(key)
+        if cached is not None:
+            _prompt_cache.move_to_end(key)
+            return cached
+
     sections = [
         _format_situation(state),
         _format_department_summary(state),
@@ -67,7 +115,13 @@ def build_user_prompt(
         _format_step_constraints(state, step),
         _format_json_schema(step),
     ]
-    return "\n\n".join(sections)
+    prompt = "\n\n".join(sections)
+
+    with _prompt_lock:
+        _prompt_cache[key] = prompt
+        if len(_prompt_cache) > _PROMPT_CACHE_SIZE:
+            _prompt_cache.popitem(last=False)
+    return prompt
 
 
 def _format_situation(state: GameState) -> str:
@@ -92,44 +146,53 @@ def _format_situation(state: GameState) -> str:
     return "\n".join(lines)
 
 
+_DEPT_TABLE_HEADER = (
+    "## Department Status\n"
+    "| Dept | Patients | Beds Avail | Staff Idle/Total | Waiting | Requests | Closed |\n"
+    "|------|----------|------------|-----------------|---------|----------|--------|"
+)
+
+
 def _format_department_summary(state: GameState) -> str:
     """Table of department statuses."""
-    lines = ["## Department Status", "| Dept | Patients | Beds Avail | Staff Idle/Total | Waiting | Requests | Closed |"]
-    lines.append("|------|----------|------------|-----------------|---------|----------|--------|")
-    for dept_id, dept in state.departments.items():
-        beds = f"{dept.beds_available}" if dept.bed_capacity is not None else "unlimited"
-        idle = dept.staff.total_idle
-        total = dept.staff.total_on_duty
-        closed = "Yes" if dept.is_closed else "No"
-        divert = " (DIVERT)" if dept.is_diverting else ""
-        lines.append(
-            f"| {dept_id.value.upper()} | {dept.total_patients} | {beds} | "
-            f"{idle}/{total} | {dept.arrivals_waiting} | "
-            f"{dept.total_requests_waiting} | {closed}{divert} |"
-        )
-    return "\n".join(lines)
+    rows = "\n".join(
+        f"| {_DEPT_UPPER[dept_id]} | {dept.total_patients} | "
+        f"{dept.beds_available if dept.bed_capacity is not None else 'unlimited'} | "
+        f"{dept.staff.total_idle}/{dept.staff.total_on_duty} | {dept.arrivals_waiting} | "
+        f"{dept.total_requests_waiting} | {'Yes' if dept.is_closed else 'No'}"
+        f"{' (DIVERT)' if dept.is_diverting else ''} |"
+        for dept_id, dept in state.departments.items()
+    )
+    return f"{_DEPT_TABLE_HEADER}\n{rows}"
+
+
+def _format_card_round(rn: int, counts: list[list[int]], amb: int) -> str:
+    """One round's known arrivals/exits, e.g. '- Round 3: ER: +2/-1, ...'."""
+    parts = [
+        f"{label}: +{arr}/-{ext}"
+        for label, (arr, ext) in zip(_DEPT_UPPER.values(), counts)
+        if arr > 0 or ext > 0
+    ]
+    if amb > 0:
+        parts.append(f"ER ambulance: {amb}")
+    detail = ", ".join(parts) if parts else "no activity"
+    event_marker = " [EVENT ROUND]" if rn in EVENT_ROUNDS else ""
+    return f"- Round {rn}: {detail}{event_marker}"
 
 
 def _format_upcoming_cards(state: GameState, horizon: int) -> str:
     """Show upcoming arrivals/exits from known card sequences."""
-    lines = ["## Upcoming Cards (next rounds)"]
     start = state.round_number
     end = min(start + horizon, 25)
-
-    for rn in range(start, end):
-        event_marker = " [EVENT ROUND]" if rn in EVENT_ROUNDS else ""
-        parts = []
-        for dept_id in DepartmentId:
-            arr = get_arrivals(dept_id, rn)
-            ext = get_exits(dept_id, rn)
-            if arr > 0 or ext > 0:
-                parts.append(f"{dept_id.value.upper()}: +{arr}/-{ext}")
-        amb = get_er_ambulance(rn)
-        if amb > 0:
-            parts.append(f"ER ambulance: {amb}")
-        detail = ", ".join(parts) if parts else "no activity"
-        lines.append(f"- Round {rn}: {detail}{event_marker}")
-    return "\n".join(lines)
+    window = get_schedule_window(start, end).tolist()
+    ambulances = get_er_ambulance_window(start, end)
+    return "\n".join([
+        "## Upcoming Cards (next rounds)",
+        *(
+            _format_card_round(rn, counts, amb)
+            for rn, counts, amb in zip(range(start, end), window, ambulances)
+        ),
+    ])
 
 
 def _format_bottlenecks(state: GameState) -> str:
@@ -172,7 +235,7 @@ def _format_step_constraints(state: GameState, step: StepType) -> str:
             if dept.arrivals_waiting > 0 or dept.total_requests_waiting > 0:
                 bed_info = f"{dept.beds_available} beds" if dept.bed_capacity is not None else "unlimited beds"
                 lines.append(
-                    f"- {dept_id.value.upper()}: {dept.arrivals_waiting} waiting, "
+                    f"- {_DEPT_UPPER[dept_id]}: {dept.arrivals_waiting} waiting, "
                     f"{dept.total_requests_waiting} transfer requests, "
                     f"{dept.staff.total_idle} idle staff, {bed_info}"
                 )
@@ -187,9 +250,9 @@ def _format_step_constraints(state: GameState, step: StepType) -> str:
         for dept_id, dept in state.departments.items():
             if dept.bed_capacity is not None:
                 pct = int(dept.total_patients / dept.bed_capacity * 100)
-                lines.append(f"- {dept_id.value.upper()}: {pct}% occupancy ({dept.total_patients}/{dept.bed_capacity} beds)")
+                lines.append(f"- {_DEPT_UPPER[dept_id]}: {pct}% occupancy ({dept.total_patients}/{dept.bed_capacity} beds)")
             else:
-                lines.append(f"- {dept_id.value.upper()}: {dept.total_patients} patients (unlimited beds)")
+                lines.append(f"- {_DEPT_UPPER[dept_id]}: {dept.total_patients} patients (unlimited beds)")
         if state.round_number < 24:
             amb = get_er_ambulance(state.round_number + 1)
             lines.append(f"Next round has {amb} ambulance arrivals.")
@@ -201,7 +264,7 @@ def _format_step_constraints(state: GameState, step: StepType) -> str:
         lines.append("Extra staff cost $40 financial + $5 quality per round — almost always worth it for hard-cap depts.")
         for dept_id, dept in state.departments.items():
             lines.append(
-                f"- {dept_id.value.upper()}: {dept.staff.total_idle} idle, "
+                f"- {_DEPT_UPPER[dept_id]}: {dept.staff.total_idle} idle, "
                 f"{dept.staff.extra_total} extra on duty, "
                 f"{dept.staff.extra_idle} extra idle"
             )
@@ -209,71 +272,80 @@ def _format_step_constraints(state: GameState, step: StepType) -> str:
     return "\n".join(lines)
 
 
-def _format_json_schema(step: StepType) -> str:
-    """Expected JSON output schema for the current step."""
-    # Common optional fields appended to each schema
-    _extra_fields = (
-        '  "reasoning_steps": ["step 1 of decision chain", "step 2 ..."],\n'
-        '  "cost_breakdown": {"action_cost": 0, "avoided_cost": 0, "net_impact": 0},\n'
-        '  "key_tradeoffs": ["tradeoff description"]\n'
-    )
-
-    schemas = {
-        StepType.ARRIVALS: (
-            '{\n'
-            '  "reasoning": "string - explain your recommendation",\n'
-            '  "action": {\n'
-            '    "admissions": [{"department": "er|surgery|cc|sd", "admit_count": int}],\n'
-            '    "transfer_accepts": [{"department": "er|surgery|cc|sd", "from_dept": "er|surgery|cc|sd", "accept_count": int}]\n'
-            '  },\n'
-            '  "confidence": 0.0-1.0,\n'
-            '  "risk_flags": ["string"],\n'
-            + _extra_fields +
-            '}'
-        ),
-        StepType.EXITS: (
-            '{\n'
-            '  "reasoning": "string - explain your recommendation",\n'
-            '  "action": {\n'
-            '    "routings": [{"from_dept": "er|surgery|cc|sd", "walkout_count": int, "transfers": {"dest_dept": count}}]\n'
-            '  },\n'
-            '  "confidence": 0.0-1.0,\n'
-            '  "risk_flags": ["string"],\n'
-            + _extra_fields +
-            '}'
-        ),
-        StepType.CLOSED: (
-            '{\n'
-            '  "reasoning": "string - explain your recommendation",\n'
-            '  "action": {\n'
-            '    "close_departments": ["er|surgery|cc|sd"],\n'
-            '    "open_departments": ["er|surgery|cc|sd"],\n'
-            '    "divert_er": true/false\n'
-            '  },\n'
-            '  "confidence": 0.0-1.0,\n'
-            '  "risk_flags": ["string"],\n'
-            + _extra_fields +
-            '}'
-        ),
-        StepType.STAFFING: (
-            '{\n'
-            '  "reasoning": "string - explain your recommendation",\n'
-            '  "action": {\n'
-            '    "extra_staff": {"dept_id": count},\n'
-            '    "return_extra": {"dept_id": count},\n'
-            '    "transfers": [{"from_dept": "dept_id", "to_dept": "dept_id", "count": int}]\n'
-            '  },\n'
-            '  "confidence": 0.0-1.0,\n'
-            '  "risk_flags": ["string"],\n'
-            + _extra_fields +
-            '}'
-        ),
-    }
-
-    schema = schemas.get(step, '{"reasoning": "string", "action": {}}')
+# Common optional fields appended to each schema
+_EXTRA_SCHEMA_FIELDS = (
+    '  "reasoning_steps": ["step 1 of decision chain", "step 2 ..."],\n'
+    '  "cost_breakdown": {"action_cost": 0, "avoided_cost": 0, "net_impact": 0},\n'
+    '  "key_tradeoffs": ["tradeoff description"]\n'
+)
+
+_SCHEMAS = {
+    StepType.ARRIVALS: (
+        '{\n'
+        '  "reasoning": "string - explain your recommendation",\n'
+        '  "action": {\n'
+        '    "admissions": [{"department": "er|surgery|cc|sd", "admit_count": int}],\n'
+        '    "transfer_accepts": [{"department": "er|surgery|cc|sd", "from_dept": "er|surgery|cc|sd", "accept_count": int}]\n'
+        '  },\n'
+        '  "confidence": 0.0-1.0,\n'
+        '  "risk_flags": ["string"],\n'
+        + _EXTRA_SCHEMA_FIELDS +
+        '}'
+    ),
+    StepType.EXITS: (
+        '{\n'
+        '  "reasoning": "string - explain your recommendation",\n'
+        '  "action": {\n'
+        '    "routings": [{"from_dept": "er|surgery|cc|sd", "walkout_count": int, "transfers": {"dest_dept": count}}]\n'
+        '  },\n'
+        '  "confidence": 0.0-1.0,\n'
+        '  "risk_flags": ["string"],\n'
+        + _EXTRA_SCHEMA_FIELDS +
+        '}'
+    ),
+    StepType.CLOSED: (
+        '{\n'
+        '  "reasoning": "string - explain your recommendation",\n'
+        '  "action": {\n'
+        '    "close_departments": ["er|surgery|cc|sd"],\n'
+        '    "open_departments": ["er|surgery|cc|sd"],\n'
+        '    "divert_er": true/false\n'
+        '  },\n'
+        '  "confidence": 0.0-1.0,\n'
+        '  "risk_flags": ["string"],\n'
+        + _EXTRA_SCHEMA_FIELDS +
+        '}'
+    ),
+    StepType.STAFFING: (
+        '{\n'
+        '  "reasoning": "string - explain your recommendation",\n'
+        '  "action": {\n'
+        '    "extra_staff": {"dept_id": count},\n'
+        '    "return_extra": {"dept_id": count},\n'
+        '    "transfers": [{"from_dept": "dept_id", "to_dept": "dept_id", "count": int}]\n'
+        '  },\n'
+        '  "confidence": 0.0-1.0,\n'
+        '  "risk_flags": ["string"],\n'
+        + _EXTRA_SCHEMA_FIELDS +
+        '}'
+    ),
+}
+
+
+def _wrap_schema(schema: str) -> str:
     return (
         f"## Required JSON Output\n"
         f"Respond ONLY with valid JSON matching this schema (no markdown, no code fences):\n"
         f"```json\n{schema}\n```\n\n"
         f"REMINDER: Output ONLY the JSON object. No other text."
     )
+
+
+# Fully formatted schema sections, built once at import
+_SCHEMA_STRINGS = {step: _wrap_schema(schema) for step, schema in _SCHEMAS.items()}
+_DEFAULT_SCHEMA_STRING = _wrap_schema('{"reasoning": "string", "action": {}}')
+
+
+def _format_json_schema(step: StepType) -> str:
+    """Expected JSON output schema for the current step."""
+    return _SCHEMA_STRINGS.get(step, _DEFAULT_SCHEMA_STRING)
@@ -5,6 +5,10 @@ optional LLM for natural-language explanations. Falls back gracefully
 when no LLM is configured or when the LLM response is invalid.
 """
 
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 
 from models.enums import StepType
@@ -22,6 +26,12 @@ from agent.output_parser import (
     ParseError, ParsedRecommendation,
 )
 
+logger = logging.getLogger(__name__)
+
+# Optimizer results kept per Recommender; refreshes/retries on an unchanged
+# state skip the Monte Carlo run.
+_OPT_CACHE_SIZE = 8
+
 
 @dataclass
 class RecommendationResponse:
@@ -49,6 +59,9 @@ class Recommender:
 
     def __init__(self, llm_client: LLMClient | None = None):
         self._llm = llm_client if llm_client is not None else LLMClient()
+        # key -> (result, candidates already dumped for the response)
+        self._opt_cache: OrderedDict[tuple, OptimizationResult] = OrderedDict()
+        self._opt_lock = threading.Lock()
 
     def recommend(
         self,
@@ -56,18 +69,23 @@ class Recommender:
         step: StepType,
         horizon: int = 6,
         mc_simulations: int = 100,
+        mc_fast: int | None = 20,
     ) -> RecommendationResponse:
         """Get a recommendation for the current step.
 
         1. Always runs optimizer (provides fallback + candidates)
         2. If LLM available: build prompt -> call LLM -> parse -> validate
         3. If LLM fails/unavailable: use optimizer's top candidate
-        """
-        optimization = optimize_step(
-            state, horizon=horizon, mc_simulations=mc_simulations
-        )
 
+        Without an LLM only the top candidate is used, so the optimizer runs
+        at most mc_fast simulations; pass mc_fast=None for full estimates.
+        """
         llm_available = self._llm.is_available()
+        if not llm_available and mc_fast is not None:
+            mc_simulations = min(mc_simulations, mc_fast)
+
+        optimization = self._optimize(state, horizon, mc_simulations)
+
         parsed: ParsedRecommendation | None = None
         source = "optimizer_fallback"
 
@@ -91,9 +109,8 @@ class Recommender:
             confidence=parsed.confidence,
             source=source,
             llm_available=llm_available,
-            optimizer_candidates=[
-                c.model_dump() for c in optimization.candidates
-            ],
+            # Dumped per response, so callers never share the cached result
+            optimizer_candidates=[c.model_dump() for c in optimization.candidates],
             baseline_cost=optimization.baseline_cost,
             horizon_used=optimization.horizon_used,
             reasoning_steps=parsed.reasoning_steps,
@@ -101,6 +118,26 @@ class Recommender:
             key_tradeoffs=parsed.key_tradeoffs,
         )
 
+    def _optimize(
+        self, state: GameState, horizon: int, mc_simulations: int
+    ) -> OptimizationResult:
+        """optimize_step() memoized on the exact state contents; treat as read-only."""
+        digest = hashlib.blake2b(state.model_dump_json().encode(), digest_size=16).digest()
+        key = (digest, horizon, mc_simulations)
+        with self._opt_lock:
+            cached = self._opt_cache.get(key)
+            if cached is not None:
+                self._opt_cache.move_to_end(key)
+                return cached
+
+        optimization = optimize_step(state, horizon=horizon, mc_simulations=mc_simulations)
+
+        with self._opt_lock:
+            self._opt_cache[key] = optimization
+            if len(self._opt_cache) > _OPT_CACHE_SIZE:
+                self._opt_cache.popitem(last=False)
+        return optimization
+
     def _try_llm_recommendation(
         self,
         state: GameState,
@@ -108,15 +145,26 @@ class Recommender:
         optimization: OptimizationResult,
         horizon: int,
     ) -> ParsedRecommendation | None:
-        """Attempt LLM recommendation; return None on any failure."""
+        """Attempt LLM recommendation; return None if the LLM path fails.
+
+        Only the expected failure modes (provider error, unparseable or
+        illegal output) fall back; anything else is a bug and propagates.
+        """
+        user_prompt = build_user_prompt(state, step, optimization, horizon)
+
         try:
-            user_prompt = build_user_prompt(state, step, optimization, horizon)
             response = self._llm.complete(SYSTEM_PROMPT, user_prompt)
+        except LLMClientError as e:
+            logger.info("LLM recommendation unavailable: %s", e)
+            return None
+
+        try:
             parsed = parse_llm_response(response.text, step)
             self._validate_action(state, step, parsed.action)
-            return parsed
-        except Exception:
+        except (ParseError, ValidationError, ValueError, KeyError, TypeError) as e:
+            logger.info("LLM recommendation rejected: %s", e)
             return None
+        return parsed
 
     def _validate_action(self, state: GameState, step: StepType, action) -> None:
         """Validate the action against game rules.
@@ -1,11 +1,17 @@
 """Chat API route — free-form conversation with the LLM agent."""
 
+import json
+from collections.abc import AsyncIterator
+
 from pydantic import BaseModel
+from typing_extensions import TypedDict
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from api.routes_game import _load_or_404
 from agent.llm_client import LLMClient, LLMClientError
-from agent.chat_prompt import CHAT_SYSTEM_PROMPT, build_chat_context
+from agent.chat_prompt import CHAT_SYSTEM_PROMPT, build_chat_context, cached_chat_context
 
 router = APIRouter(prefix="/api/game", tags=["chat"])
 
@@ -13,8 +19,14 @@ _client = LLMClient()
 
 MAX_HISTORY = 20
 
+_NOT_CONFIGURED_REPLY = (
+    "LLM is not configured. Set `WHOP_LLM_PROVIDER` in your "
+    "environment to enable chat (e.g. ollama, claude, openai)."
+)
+
 
-class ChatMessage(BaseModel):
+class ChatMessage(TypedDict):
+    # Validated straight into plain dicts, which is the shape the LLM client takes
     role: str  # "user" or "assistant"
     content: str
 
@@ -31,36 +43,48 @@ class ChatResponse(BaseModel):
     llm_available: bool
 
 
+async def _build_chat_inputs(state, req: ChatRequest) -> tuple[str, list[dict]]:
+    """System prompt with current game context, plus truncated message history."""
+    # Follow-up messages on an unchanged state hit the context cache; only a
+    # fresh build (analytics passes) is worth a threadpool hop.
+    context = cached_chat_context(state)
+    if context is None:
+        context = await run_in_threadpool(build_chat_context, state)
+    system = f"{CHAT_SYSTEM_PROMPT}\n\n{context}"
+
+    # Truncate history to last N messages, then append current user message
+    history = req.history[-MAX_HISTORY:]
+    history.append({"role": "user", "content": req.message})
+    return system, history
+
+
+def _sse(data: str, event: str | None = None) -> str:
+    """Format one server-sent event with a JSON-encoded payload."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
 @router.post("/{game_id}/chat")
-def chat(game_id: str, req: ChatRequest) -> ChatResponse:
+async def chat(game_id: str, req: ChatRequest) -> ChatResponse:
     """Free-form chat with the AI advisor about the current game.
 
     The LLM receives the full game context (state, upcoming cards,
     bottlenecks) plus conversation history. No JSON output constraints.
     """
-    state = _load_or_404(game_id)
+    state = await run_in_threadpool(_load_or_404, game_id)
 
     if not _client.is_available():
         return ChatResponse(
-            reply=(
-                "LLM is not configured. Set `WHOP_LLM_PROVIDER` in your "
-                "environment to enable chat (e.g. ollama, claude, openai)."
-            ),
+            reply=_NOT_CONFIGURED_REPLY,
             provider="none",
             model="none",
             llm_available=False,
         )
 
-    # Build system prompt with current game context
-    context = build_chat_context(state)
-    system = f"{CHAT_SYSTEM_PROMPT}\n\n{context}"
-
-    # Truncate history to last N messages, then append current user message
-    history = [{"role": m.role, "content": m.content} for m in req.history[-MAX_HISTORY:]]
-    history.append({"role": "user", "content": req.message})
+    system, history = await _build_chat_inputs(state, req)
 
     try:
-        resp = _client.chat(system, history)
+        resp = await _client.achat(system, history)
         return ChatResponse(
             reply=resp.text,
             provider=resp.provider,
@@ -74,3 +98,30 @@ def chat(game_id: str, req: ChatRequest) -> ChatResponse:
             model="error",
             llm_available=True,
         )
+
+
+@router.post("/{game_id}/chat/stream")
+async def chat_stream(game_id: str, req: ChatRequest) -> StreamingResponse:
+    """Streaming variant of chat(): the reply arrives as server-sent events.
+
+    Each `data:` event carries a JSON-encoded text chunk. The stream ends
+    with an `event: done`, or `event: error` carrying the error message.
+    """
+    state = await run_in_threadpool(_load_or_404, game_id)
+
+    async def events() -> AsyncIterator[str]:
+        if not _client.is_available():
+            yield _sse(_NOT_CONFIGURED_REPLY)
+            yield _sse("", event="done")
+            return
+
+        system, history = await _build_chat_inputs(state, req)
+        try:
+            async for chunk in _client.astream(system, history):
+                yield _sse(chunk)
+        except LLMClientError as e:
+            yield _sse(str(e), event="error")
+            return
+        yield _sse("", event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
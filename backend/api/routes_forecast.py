@@ -1,9 +1,16 @@
 """Forecast and optimization API routes."""
 
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable
+
 from fastapi import APIRouter, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
 
 from config import settings
-from api.routes_game import _load_or_404
+from api.routes_game import _load_or_404, _JSONResponse
 from forecast.monte_carlo import run_monte_carlo
 from forecast.optimizer import optimize_step
 from forecast.metrics import (
@@ -16,23 +23,38 @@ from forecast.metrics import (
 
 router = APIRouter(prefix="/api/game", tags=["forecast"])
 
+# Responses are pure functions of (state, horizon, sims); frontends poll these
+# endpoints between steps, so identical inputs recur. A new state hashes differently,
+# so nothing needs explicit invalidation.
+_RESPONSE_CACHE_SIZE = 64
+_response_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_response_lock = threading.Lock()
 
-@router.get("/{game_id}/forecast")
-def forecast(game_id: str, horizon: int | None = None):
-    """Run Monte Carlo forecast with comprehensive metrics.
 
-    Args:
-        game_id: UUID of the game session.
-        horizon: Number of rounds to look ahead (default from settings).
+def _cached_response(state, params: tuple, compute: Callable[[], dict]) -> Response:
+    """Return compute() memoized on the exact state contents plus params.
 
-    Returns:
-        JSON with monte_carlo results, utilization, capacity_forecast,
-        bottlenecks, diversion_roi, and staff_efficiency analysis.
+    The payload is cached already encoded, so repeat hits skip both
+    jsonable_encoder and the JSON dump.
     """
-    state = _load_or_404(game_id)
-    h = horizon or settings.default_forecast_horizon
-
-    mc = run_monte_carlo(state, h, num_simulations=settings.default_mc_simulations)
+    digest = hashlib.blake2b(state.model_dump_json().encode(), digest_size=16).digest()
+    key = (digest, *params)
+    with _response_lock:
+        body = _response_cache.get(key)
+        if body is not None:
+            _response_cache.move_to_end(key)
+    if body is None:
+        body = _JSONResponse(jsonable_encoder(compute())).body
+        with _response_lock:
+            _response_cache[key] = body
+            if len(_response_cache) > _RESPONSE_CACHE_SIZE:
+                _response_cache.popitem(last=False)
+    return Response(body, media_type="application/json")
+
+
+def _forecast_response(state, h: int, sims: int) -> dict:
+    """Monte Carlo summary plus the per-department metrics."""
+    mc = run_monte_carlo(state, h, num_simulations=sims)
 
     # Gather metrics
     utilization = {
@@ -54,6 +76,24 @@ def forecast(game_id: str, horizon: int | None = None):
     }
 
 
+@router.get("/{game_id}/forecast")
+def forecast(game_id: str, horizon: int | None = None):
+    """Run Monte Carlo forecast with comprehensive metrics.
+
+    Args:
+        game_id: UUID of the game session.
+        horizon: Number of rounds to look ahead (default from settings).
+
+    Returns:
+        JSON with monte_carlo results, utilization, capacity_forecast,
+        bottlenecks, diversion_roi, and staff_efficiency analysis.
+    """
+    state = _load_or_404(game_id)
+    h = horizon or settings.default_forecast_horizon
+    sims = settings.default_mc_simulations
+    return _cached_response(state, ("forecast", h, sims), lambda: _forecast_response(state, h, sims))
+
+
 @router.get("/{game_id}/forecast-snapshot")
 def forecast_snapshot(game_id: str, horizon: int | None = None):
     """Lightweight combined forecast + metrics endpoint.
@@ -63,38 +103,27 @@ def forecast_snapshot(game_id: str, horizon: int | None = None):
     """
     state = _load_or_404(game_id)
     h = horizon or settings.default_forecast_horizon
-
-    mc = run_monte_carlo(state, h, num_simulations=settings.default_mc_simulations)
-
-    utilization = {
-        dept_id.value: department_utilization(dept)
-        for dept_id, dept in state.departments.items()
-    }
-    cap = capacity_forecast(state, h)
-    bottlenecks = bottleneck_detection(state)
-    div_roi = diversion_roi(state, h)
-    staff = staff_efficiency_analysis(state)
-
-    return {
-        "monte_carlo": mc.model_dump(),
-        "utilization": utilization,
-        "capacity_forecast": cap,
-        "bottlenecks": bottlenecks,
-        "diversion_roi": div_roi,
-        "staff_efficiency": staff,
-    }
+    sims = settings.default_mc_simulations
+    return _cached_response(state, ("forecast", h, sims), lambda: _forecast_response(state, h, sims))
 
 
 @router.get("/{game_id}/optimize")
-def optimize(game_id: str, horizon: int | None = None, mc_sims: int | None = None):
+def optimize(
+    game_id: str,
+    horizon: int | None = None,
+    mc_sims: int | None = None,
+    mc_screen_sims: int | None = None,
+):
     """Run optimizer to generate and rank candidate actions for the current step.
 
-    Uses 2-phase scoring: fast deterministic pruning, then Monte Carlo on top candidates.
+    Uses multi-fidelity scoring: fast deterministic pruning, a short Monte Carlo
+    screen of the survivors, then the full Monte Carlo run on the front-runners.
 
     Args:
         game_id: UUID of the game session.
         horizon: Lookahead rounds (default from settings).
         mc_sims: Number of Monte Carlo simulations (default from settings).
+        mc_screen_sims: Simulations for the screening pass (default from settings).
 
     Returns:
         OptimizationResult with ranked candidates, baseline cost, and horizon used.
@@ -102,6 +131,11 @@ def optimize(game_id: str, horizon: int | None = None, mc_sims: int | None = Non
     state = _load_or_404(game_id)
     h = horizon or settings.default_forecast_horizon
     sims = mc_sims or settings.default_mc_simulations
-
-    result = optimize_step(state, horizon=h, mc_simulations=sims)
-    return result.model_dump()
+    screen = mc_screen_sims or settings.default_mc_screen_simulations
+
+    return _cached_response(
+        state, ("optimize", h, sims, screen),
+        lambda: optimize_step(
+            state, horizon=h, mc_simulations=sims, screen_simulations=screen,
+        ).model_dump(),
+    )
@@ -1,11 +1,18 @@
 """Core game API routes."""
 
-import csv
-import io
+import functools
+import json
 import uuid
+from datetime import datetime
+from typing import Callable, Iterator
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
 
 from models.game_state import GameState
 from models.actions import ArrivalsAction, ExitsAction, ClosedAction, StaffingAction, CardOverrides
@@ -27,6 +34,9 @@ from db import repository as repo
 
 router = APIRouter(prefix="/api/game", tags=["game"])
 
+# App-wide default response class (see main.py); orjson encodes in C when installed
+_JSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
 
 def _load_or_404(game_id: str) -> GameState:
     """Load game state or raise 404."""
@@ -37,10 +47,34 @@ def _load_or_404(game_id: str) -> GameState:
     return state
 
 
-def _save(state: GameState) -> None:
-    """Persist state to DB."""
-    with get_db() as conn:
-        repo.save_state(conn, state)
+def _state_response(state: GameState) -> Response:
+    """Serialize state straight to JSON, skipping FastAPI's jsonable_encoder pass."""
+    return Response(state.model_dump_json(), media_type="application/json")
+
+
+def _run_step(
+    game_id: str, step: str, action_json: str, process: Callable[[GameState], GameState]
+) -> Response:
+    """Load, process, save and log one step in a single transaction."""
+    error = None
+    with get_db(immediate=True) as conn:
+        state = repo.load_state(conn, game_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
+        try:
+            state = process(state)
+        except ValidationError as e:
+            error = str(e)
+            repo.log_action(conn, game_id, state.round_number, step, action_json, "error", error)
+        else:
+            state_json = state.model_dump_json()
+            now = datetime.utcnow().isoformat()
+            repo.save_state(conn, state, state_json, now)
+            repo.log_action(conn, game_id, state.round_number, step, action_json, now=now)
+    if error is not None:
+        raise HTTPException(status_code=400, detail=error)
+    # Same JSON that was just stored, so the response costs no second dump
+    return Response(state_json, media_type="application/json")
 
 
 @router.post("/new")
@@ -55,9 +89,14 @@ def new_game(config: CustomGameConfig | None = None):
     """
     game_id = str(uuid.uuid4())
     state = create_game(game_id, config=config)
+    state_json = state.model_dump_json()
     with get_db() as conn:
-        repo.create_session(conn, game_id, state)
-    return {"game_id": game_id, "state": state.model_dump()}
+        repo.create_session(conn, game_id, state, state_json)
+    # Embed the stored snapshot rather than dumping the state a second time
+    return Response(
+        f'{{"game_id":{json.dumps(game_id)},"state":{state_json}}}',
+        media_type="application/json",
+    )
 
 
 @router.get("/{game_id}/state")
@@ -74,7 +113,7 @@ def get_state(game_id: str):
         404: Game not found.
     """
     state = _load_or_404(game_id)
-    return state.model_dump()
+    return _state_response(state)
 
 
 @router.post("/{game_id}/step/event")
@@ -92,17 +131,10 @@ def step_event(game_id: str, event_seed: int | None = None, card_overrides: Card
     Raises:
         400: Wrong step or validation error. 404: Game not found.
     """
-    state = _load_or_404(game_id)
-    try:
-        state = process_event_step(state, event_seed=event_seed, card_overrides=card_overrides)
-    except ValidationError as e:
-        with get_db() as conn:
-            repo.log_action(conn, game_id, state.round_number, "event", "{}", "error", str(e))
-        raise HTTPException(status_code=400, detail=str(e))
-    _save(state)
-    with get_db() as conn:
-        repo.log_action(conn, game_id, state.round_number, "event", "{}")
-    return state.model_dump()
+    return _run_step(
+        game_id, "event", "{}",
+        lambda state: process_event_step(state, event_seed=event_seed, card_overrides=card_overrides),
+    )
 
 
 @router.post("/{game_id}/step/arrivals")
@@ -116,17 +148,7 @@ def step_arrivals(game_id: str, action: ArrivalsAction):
     Returns:
         Updated GameState. Raises 400 if action violates constraints (staff/beds).
     """
-    state = _load_or_404(game_id)
-    try:
-        state = process_arrivals_step(state, action)
-    except ValidationError as e:
-        with get_db() as conn:
-            repo.log_action(conn, game_id, state.round_number, "arrivals", action.model_dump_json(), "error", str(e))
-        raise HTTPException(status_code=400, detail=str(e))
-    _save(state)
-    with get_db() as conn:
-        repo.log_action(conn, game_id, state.round_number, "arrivals", action.model_dump_json())
-    return state.model_dump()
+    return _run_step(game_id, "arrivals", action.model_dump_json(), lambda state: process_arrivals_step(state, action))
 
 
 @router.post("/{game_id}/step/exits")
@@ -140,17 +162,7 @@ def step_exits(game_id: str, action: ExitsAction):
     Returns:
         Updated GameState. Raises 400 if routing is invalid.
     """
-    state = _load_or_404(game_id)
-    try:
-        state = process_exits_step(state, action)
-    except ValidationError as e:
-        with get_db() as conn:
-            repo.log_action(conn, game_id, state.round_number, "exits", action.model_dump_json(), "error", str(e))
-        raise HTTPException(status_code=400, detail=str(e))
-    _save(state)
-    with get_db() as conn:
-        repo.log_action(conn, game_id, state.round_number, "exits", action.model_dump_json())
-    return state.model_dump()
+    return _run_step(game_id, "exits", action.model_dump_json(), lambda state: process_exits_step(state, action))
 
 
 @router.post("/{game_id}/step/closed")
@@ -164,17 +176,7 @@ def step_closed(game_id: str, action: ClosedAction):
     Returns:
         Updated GameState.
     """
-    state = _load_or_404(game_id)
-    try:
-        state = process_closed_step(state, action)
-    except ValidationError as e:
-        with get_db() as conn:
-            repo.log_action(conn, game_id, state.round_number, "closed", action.model_dump_json(), "error", str(e))
-        raise HTTPException(status_code=400, detail=str(e))
-    _save(state)
-    with get_db() as conn:
-        repo.log_action(conn, game_id, state.round_number, "closed", action.model_dump_json())
-    return state.model_dump()
+    return _run_step(game_id, "closed", action.model_dump_json(), lambda state: process_closed_step(state, action))
 
 
 @router.post("/{game_id}/step/staffing")
@@ -188,17 +190,7 @@ def step_staffing(game_id: str, action: StaffingAction):
     Returns:
         Updated GameState. Raises 400 if staffing violates constraints.
     """
-    state = _load_or_404(game_id)
-    try:
-        state = process_staffing_step(state, action)
-    except ValidationError as e:
-        with get_db() as conn:
-            repo.log_action(conn, game_id, state.round_number, "staffing", action.model_dump_json(), "error", str(e))
-        raise HTTPException(status_code=400, detail=str(e))
-    _save(state)
-    with get_db() as conn:
-        repo.log_action(conn, game_id, state.round_number, "staffing", action.model_dump_json())
-    return state.model_dump()
+    return _run_step(game_id, "staffing", action.model_dump_json(), lambda state: process_staffing_step(state, action))
 
 
 @router.post("/{game_id}/step/paperwork")
@@ -211,17 +203,7 @@ def step_paperwork(game_id: str):
     Returns:
         Updated GameState with new round_costs entry. Sets is_finished=true after round 24.
     """
-    state = _load_or_404(game_id)
-    try:
-        state = process_paperwork_step(state)
-    except ValidationError as e:
-        with get_db() as conn:
-            repo.log_action(conn, game_id, state.round_number, "paperwork", "{}", "error", str(e))
-        raise HTTPException(status_code=400, detail=str(e))
-    _save(state)
-    with get_db() as conn:
-        repo.log_action(conn, game_id, state.round_number, "paperwork", "{}")
-    return state.model_dump()
+    return _run_step(game_id, "paperwork", "{}", process_paperwork_step)
 
 
 @router.get("/{game_id}/round-cards/{round_number}")
@@ -230,14 +212,18 @@ def round_cards(game_id: str, round_number: int):
 
     Returns per-department arrival and exit counts from the fixed card sequences.
     """
-    _load_or_404(game_id)  # verify game exists
+    with get_db() as conn:
+        exists = repo.get_session(conn, game_id) is not None
+    if not exists:
+        raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
     if round_number < 1 or round_number > 24:
         raise HTTPException(status_code=400, detail="Round must be 1-24")
     return _build_round_cards(round_number)
 
 
+@functools.lru_cache(maxsize=24)
 def _build_round_cards(round_number: int) -> dict:
-    """Build a dict of card data for the given round."""
+    """Build a dict of card data for the given round (cached; treat as read-only)."""
     from data.card_sequences import get_arrivals as _get_arrivals
 
     departments = {}
@@ -258,13 +244,11 @@ def get_history(game_id: str):
 
     Returns per-round cost breakdowns and cumulative totals for the entire game.
     """
-    state = _load_or_404(game_id)
-    return {
-        "game_id": game_id,
-        "round_costs": [rc.model_dump() for rc in state.round_costs],
-        "total_financial_cost": state.total_financial_cost,
-        "total_quality_cost": state.total_quality_cost,
-    }
+    with get_db() as conn:
+        body = repo.load_history_json(conn, game_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
+    return Response(body, media_type="application/json")
 
 
 @router.get("/{game_id}/export/csv")
@@ -274,81 +258,78 @@ def export_csv(game_id: str):
     Returns a text/csv response with per-round cost breakdowns by department
     and category, plus cumulative totals. The last row contains grand totals.
     """
-    state = _load_or_404(game_id)
-    if not state.round_costs:
+    with get_db() as conn:
+        history = repo.load_cost_history(conn, game_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
+    round_costs = history[0]
+    if not round_costs:
         raise HTTPException(status_code=400, detail="No rounds completed yet")
 
-    headers = [
-        "Round",
-        "ER Waiting (Fin)", "ER Waiting (Qual)",
-        "Surgery Arrivals Waiting (Fin)", "Surgery Arrivals Waiting (Qual)",
-        "Surgery Requests Waiting (Fin)", "Surgery Requests Waiting (Qual)",
-        "CC Arrivals Waiting (Fin)", "CC Arrivals Waiting (Qual)",
-        "CC Requests Waiting (Fin)", "CC Requests Waiting (Qual)",
-        "SD Arrivals Waiting (Fin)", "SD Arrivals Waiting (Qual)",
-        "SD Requests Waiting (Fin)", "SD Requests Waiting (Qual)",
-        "ER Extra Staff (Fin)", "ER Extra Staff (Qual)",
-        "Surgery Extra Staff (Fin)", "Surgery Extra Staff (Qual)",
-        "CC Extra Staff (Fin)", "CC Extra Staff (Qual)",
-        "SD Extra Staff (Fin)", "SD Extra Staff (Qual)",
-        "ER Diversion (Fin)", "ER Diversion (Qual)",
-        "Round Financial Total", "Round Quality Total",
-        "Cumulative Financial", "Cumulative Quality",
-    ]
-
-    # Map detail keys to CSV column pairs
-    detail_columns = [
-        ("er_patients_waiting_fin", "er_patients_waiting_qual"),
-        ("surgery_arrivals_waiting_fin", "surgery_arrivals_waiting_qual"),
-        ("surgery_requests_waiting_fin", "surgery_requests_waiting_qual"),
-        ("cc_arrivals_waiting_fin", "cc_arrivals_waiting_qual"),
-        ("cc_requests_waiting_fin", "cc_requests_waiting_qual"),
-        ("sd_arrivals_waiting_fin", "sd_arrivals_waiting_qual"),
-        ("sd_requests_waiting_fin", "sd_requests_waiting_qual"),
-        ("er_extra_staff_fin", "er_extra_staff_qual"),
-        ("surgery_extra_staff_fin", "surgery_extra_staff_qual"),
-        ("cc_extra_staff_fin", "cc_extra_staff_qual"),
-        ("sd_extra_staff_fin", "sd_extra_staff_qual"),
-        ("er_diversion_fin", "er_diversion_qual"),
-    ]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(headers)
+    return StreamingResponse(
+        _csv_lines(round_costs),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=whop_game_{game_id[:8]}.csv"},
+    )
+
+
+_CSV_HEADERS = [
+    "Round",
+    "ER Waiting (Fin)", "ER Waiting (Qual)",
+    "Surgery Arrivals Waiting (Fin)", "Surgery Arrivals Waiting (Qual)",
+    "Surgery Requests Waiting (Fin)", "Surgery Requests Waiting (Qual)",
+    "CC Arrivals Waiting (Fin)", "CC Arrivals Waiting (Qual)",
+    "CC Requests Waiting (Fin)", "CC Requests Waiting (Qual)",
+    "SD Arrivals Waiting (Fin)", "SD Arrivals Waiting (Qual)",
+    "SD Requests Waiting (Fin)", "SD Requests Waiting (Qual)",
+    "ER Extra Staff (Fin)", "ER Extra Staff (Qual)",
+    "Surgery Extra Staff (Fin)", "Surgery Extra Staff (Qual)",
+    "CC Extra Staff (Fin)", "CC Extra Staff (Qual)",
+    "SD Extra Staff (Fin)", "SD Extra Staff (Qual)",
+    "ER Diversion (Fin)", "ER Diversion (Qual)",
+    "Round Financial Total", "Round Quality Total",
+    "Cumulative Financial", "Cumulative Quality",
+]
+
+# Detail keys in CSV column order, (fin, qual) pairs flattened
+_CSV_DETAIL_KEYS = [
+    f"{prefix}_{kind}"
+    for prefix in (
+        "er_patients_waiting",
+        "surgery_arrivals_waiting", "surgery_requests_waiting",
+        "cc_arrivals_waiting", "cc_requests_waiting",
+        "sd_arrivals_waiting", "sd_requests_waiting",
+        "er_extra_staff", "surgery_extra_staff", "cc_extra_staff", "sd_extra_staff",
+        "er_diversion",
+    )
+    for kind in ("fin", "qual")
+]
+
+
+def _csv_line(row: list) -> str:
+    # All cells are numbers or fixed headers, so no quoting is needed.
+    return ",".join(map(str, row)) + "\r\n"
+
+
+def _csv_lines(round_costs: list) -> Iterator[str]:
+    """Yield the worksheet one CSV line at a time: header, rounds, totals."""
+    yield _csv_line(_CSV_HEADERS)
 
     cum_fin = 0
     cum_qual = 0
     # Accumulators for totals row
-    totals = [0] * (len(headers) - 1)  # everything except "Round"
+    totals = [0] * (len(_CSV_DETAIL_KEYS) + 2)
 
-    for rc in state.round_costs:
+    for rc in round_costs:
         cum_fin += rc.financial
         cum_qual += rc.quality
-        row = [rc.round_number]
-        col_idx = 0
-        for fin_key, qual_key in detail_columns:
-            f = rc.details.get(fin_key, 0)
-            q = rc.details.get(qual_key, 0)
-            row.extend([f, q])
-            totals[col_idx] += f
-            totals[col_idx + 1] += q
-            col_idx += 2
-        row.extend([rc.financial, rc.quality, cum_fin, cum_qual])
-        totals[col_idx] += rc.financial
-        totals[col_idx + 1] += rc.quality
-        # Cumulative columns in totals row just use the final cumulative
-        writer.writerow(row)
-
-    # Totals row
-    totals_row = ["TOTAL"] + totals[:-2] + [cum_fin, cum_qual]
-    writer.writerow(totals_row)
-
-    output.seek(0)
-    return StreamingResponse(
-        output,
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=whop_game_{game_id[:8]}.csv"},
-    )
+        cells = [rc.details.get(key, 0) for key in _CSV_DETAIL_KEYS]
+        cells += (rc.financial, rc.quality)
+        totals = [t + c for t, c in zip(totals, cells)]
+        yield _csv_line([rc.round_number, *cells, cum_fin, cum_qual])
+
+    # Cumulative columns in the totals row just use the final cumulative
+    yield _csv_line(["TOTAL", *totals, cum_fin, cum_qual])
 
 
 @router.get("/{game_id}/replay")
@@ -358,16 +339,20 @@ def get_replay(game_id: str):
     Returns one entry per completed round, each containing department summaries,
     costs, and active events for that round.
     """
-    state = _load_or_404(game_id)
     with get_db() as conn:
-        snapshots = repo.get_round_snapshots(conn, game_id)
+        state = repo.load_state(conn, game_id)
+        snapshots = repo.get_round_snapshots(conn, game_id) if state is not None else []
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Game {game_id} not found")
+
+    # Round cost entries are append-only, so the latest state indexes them all
+    cost_by_round = {rc.round_number: rc for rc in state.round_costs}
 
     rounds = []
     for snap_state in snapshots:
         # Build department summaries
-        depts = {}
-        for dept_id, dept in snap_state.departments.items():
-            depts[dept_id.value] = {
+        depts = {
+            dept_id.value: {
                 "patients": dept.total_patients,
                 "beds_available": dept.beds_available,
                 "staff_idle": dept.staff.total_idle,
@@ -377,14 +362,10 @@ def get_replay(game_id: str):
                 "is_closed": dept.is_closed,
                 "is_diverting": dept.is_diverting,
             }
+            for dept_id, dept in snap_state.departments.items()
+        }
 
-        # Find matching round cost entry
-        cost_entry = None
-        for rc in snap_state.round_costs:
-            if rc.round_number == snap_state.round_number:
-                cost_entry = rc
-                break
-
+        cost_entry = cost_by_round.get(snap_state.round_number)
         costs = {
             "financial": cost_entry.financial if cost_entry else 0,
             "quality": cost_entry.quality if cost_entry else 0,
@@ -392,10 +373,11 @@ def get_replay(game_id: str):
         }
 
         # Collect active event descriptions
-        events = []
-        for dept in snap_state.departments.values():
-            for ev in dept.active_events:
-                events.append(ev.description)
+        events = [
+            ev.description
+            for dept in snap_state.departments.values()
+            for ev in dept.active_events
+        ]
 
         rounds.append({
             "round_number": snap_state.round_number,
@@ -54,6 +54,7 @@ def recommend(game_id: str, step: str):
         step_type,
         horizon=settings.default_forecast_horizon,
         mc_simulations=settings.default_mc_simulations,
+        mc_fast=settings.fallback_mc_simulations,
     )
 
     return {
@@ -8,6 +8,10 @@ class Settings(BaseSettings):
     cors_origins: list[str] = ["http://localhost:3000", "http://localhost:5173"]
     default_forecast_horizon: int = 6
     default_mc_simulations: int = 100
+    # Short Monte Carlo screen the optimizer runs before the full run on front-runners
+    default_mc_screen_simulations: int = 10
+    # Monte Carlo runs for recommendations when no LLM is configured (top pick only)
+    fallback_mc_simulations: int = 20
 
     # LLM provider: "none", "ollama", "llamacpp", "vllm", "claude", "openai"
     llm_provider: str = "none"
@@ -30,11 +34,32 @@ class Settings(BaseSettings):
     # OpenAI (cloud, requires API key)
     openai_api_key: str = ""
     openai_model: str = "gpt-4o"
+    openai_base_url: str = "https://api.openai.com"
+    openai_organization: str = ""   # sent as OpenAI-Organization when set
 
     # Shared LLM settings
     llm_temperature: float = 0.3
     llm_max_tokens: int = 2048
-    llm_timeout_seconds: float = 30.0
+    llm_timeout_seconds: float = 30.0   # read timeout per attempt
+    llm_connect_timeout_seconds: float = 5.0
+    # Read timeout for the first provider when llm_fallback_chain is set
+    llm_first_attempt_timeout: float = 15.0
+
+    # Retries for transient provider errors (timeouts, 429/5xx)
+    llm_max_attempts: int = 3
+    llm_retry_base_delay: float = 2.0
+
+    # Providers tried in order after llm_provider fails, e.g. ["openai", "ollama"]
+    llm_fallback_chain: list[str] = []
+    # Skip a provider for llm_circuit_cooldown_seconds after this many consecutive failures
+    llm_circuit_failure_threshold: int = 3
+    llm_circuit_cooldown_seconds: float = 30.0
+    # Async chat only: start the first fallback if the main provider hasn't
+    # answered within llm_hedge_delay_seconds, and use whichever replies first
+    llm_enable_hedging: bool = False
+    llm_hedge_delay_seconds: float = 2.0
+    # Approximate prompt size limit (system + history); oldest turns are dropped first
+    llm_prompt_budget_tokens: int = 8000
 
     model_config = {"env_file": (".env", "../.env"), "env_prefix": "WHOP_", "extra": "ignore"}
 
@@ -4,6 +4,10 @@ The IDSS has perfect information about these — they are deterministic,
 not random. Index 0 = Round 1, Index 23 = Round 24.
 """
 
+import functools
+
+import numpy as np
+
 from models.enums import DepartmentId
 
 # ER arrivals
@@ -30,19 +34,61 @@ SD_ARRIVALS = [1, 2, 1, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
 SD_EXITS = [3, 2, 4, 3, 1, 2, 3, 2, 0, 0, 0, 0, 0, 0, 0, 0, 3, 2, 4, 3, 1, 2, 3, 2]  # sum=40
 # Step Down exits always leave (discharged)
 
+# Dense schedule, shape (24 rounds, len(DepartmentId), 2): [..., 0] arrivals
+# (ER = walk-in + ambulance), [..., 1] exits. Departments in enum order.
+SCHEDULE = np.stack([
+    np.array([
+        [ER_WALKIN[i] + ER_AMBULANCE[i], ER_EXITS[i]],
+        [SURGERY_ARRIVALS[i], SURGERY_EXITS[i]],
+        [CC_ARRIVALS[i], CC_EXITS[i]],
+        [SD_ARRIVALS[i], SD_EXITS[i]],
+    ], dtype=np.int16)
+    for i in range(24)
+])
+SCHEDULE.flags.writeable = False
+
+
+# Per-department lookup tables (ER arrivals pre-summed); unknown departments get no cards
+_ARRIVALS_BY_DEPT = {
+    DepartmentId.ER: tuple(w + a for w, a in zip(ER_WALKIN, ER_AMBULANCE)),
+    DepartmentId.SURGERY: tuple(SURGERY_ARRIVALS),
+    DepartmentId.CRITICAL_CARE: tuple(CC_ARRIVALS),
+    DepartmentId.STEP_DOWN: tuple(SD_ARRIVALS),
+}
+_EXITS_BY_DEPT = {
+    DepartmentId.ER: tuple(ER_EXITS),
+    DepartmentId.SURGERY: tuple(SURGERY_EXITS),
+    DepartmentId.CRITICAL_CARE: tuple(CC_EXITS),
+    DepartmentId.STEP_DOWN: tuple(SD_EXITS),
+}
+_NO_CARDS = (0,) * 24
+
+# dept -> (routing sequence, destination once the sequence runs out)
+_EXIT_ROUTING = {
+    DepartmentId.ER: (tuple(ER_EXIT_SEQUENCE), "out"),
+    DepartmentId.SURGERY: (tuple(SURGERY_EXIT_SEQUENCE), "stepdown"),
+    DepartmentId.CRITICAL_CARE: ((), "stepdown"),
+    DepartmentId.STEP_DOWN: ((), "out"),
+}
+_DEFAULT_ROUTING = ((), "out")
+
+# Routing names resolved to the receiving department; None means discharge
+_ROUTE_DESTINATIONS: dict[str, DepartmentId | None] = {
+    "out": None,
+    "surgery": DepartmentId.SURGERY,
+    "criticalcare": DepartmentId.CRITICAL_CARE,
+    "stepdown": DepartmentId.STEP_DOWN,
+}
+_EXIT_DESTINATIONS = {
+    dept: (tuple(_ROUTE_DESTINATIONS[r] for r in sequence), _ROUTE_DESTINATIONS[fallback])
+    for dept, (sequence, fallback) in _EXIT_ROUTING.items()
+}
+_DEFAULT_DESTINATION = ((), None)
+
 
 def get_arrivals(dept: DepartmentId, round_number: int) -> int:
     """Get arrival count for a department at a given round (1-indexed)."""
-    idx = round_number - 1
-    if dept == DepartmentId.ER:
-        return ER_WALKIN[idx] + ER_AMBULANCE[idx]
-    elif dept == DepartmentId.SURGERY:
-        return SURGERY_ARRIVALS[idx]
-    elif dept == DepartmentId.CRITICAL_CARE:
-        return CC_ARRIVALS[idx]
-    elif dept == DepartmentId.STEP_DOWN:
-        return SD_ARRIVALS[idx]
-    return 0
+    return _ARRIVALS_BY_DEPT.get(dept, _NO_CARDS)[round_number - 1]
 
 
 def get_er_walkin(round_number: int) -> int:
@@ -55,16 +101,20 @@ def get_er_ambulance(round_number: int) -> int:
 
 def get_exits(dept: DepartmentId, round_number: int) -> int:
     """Get exit count for a department at a given round (1-indexed)."""
-    idx = round_number - 1
-    if dept == DepartmentId.ER:
-        return ER_EXITS[idx]
-    elif dept == DepartmentId.SURGERY:
-        return SURGERY_EXITS[idx]
-    elif dept == DepartmentId.CRITICAL_CARE:
-        return CC_EXITS[idx]
-    elif dept == DepartmentId.STEP_DOWN:
-        return SD_EXITS[idx]
-    return 0
+    return _EXITS_BY_DEPT.get(dept, _NO_CARDS)[round_number - 1]
+
+
+def get_schedule_window(start_round: int, end_round: int) -> np.ndarray:
+    """Arrivals/exits for rounds [start_round, end_round) as a read-only view.
+
+    Shape (end_round - start_round, len(DepartmentId), 2); see SCHEDULE.
+    """
+    return SCHEDULE[start_round - 1:end_round - 1]
+
+
+def get_er_ambulance_window(start_round: int, end_round: int) -> list[int]:
+    """ER ambulance arrivals for rounds [start_round, end_round)."""
+    return ER_AMBULANCE[start_round - 1:end_round - 1]
 
 
 def get_exit_routing(dept: DepartmentId, exit_index: int) -> str:
@@ -77,16 +127,38 @@ def get_exit_routing(dept: DepartmentId, exit_index: int) -> str:
     
     exit_index is the position within that round's exits (0-based).
     """
-    if dept == DepartmentId.ER:
-        if exit_index < len(ER_EXIT_SEQUENCE):
-            return ER_EXIT_SEQUENCE[exit_index]
-        return "out"  # fallback
-    elif dept == DepartmentId.SURGERY:
-        if exit_index < len(SURGERY_EXIT_SEQUENCE):
-            return SURGERY_EXIT_SEQUENCE[exit_index]
-        return "stepdown"  # fallback
-    elif dept == DepartmentId.CRITICAL_CARE:
-        return "stepdown"
-    elif dept == DepartmentId.STEP_DOWN:
-        return "out"
-    return "out"
+    sequence, fallback = _EXIT_ROUTING.get(dept, _DEFAULT_ROUTING)
+    if sequence and exit_index < len(sequence):
+        return sequence[exit_index]
+    return fallback
+
+
+def get_exit_destination(dept: DepartmentId, exit_index: int) -> DepartmentId | None:
+    """Same as get_exit_routing, resolved to the receiving department.
+
+    Returns None when the patient is discharged ("out").
+    """
+    sequence, fallback = _EXIT_DESTINATIONS.get(dept, _DEFAULT_DESTINATION)
+    if sequence and exit_index < len(sequence):
+        return sequence[exit_index]
+    return fallback
+
+
+@functools.lru_cache(maxsize=256)
+def get_exit_plan(
+    dept: DepartmentId, exit_count: int
+) -> tuple[int, tuple[tuple[DepartmentId, int], ...]]:
+    """Summarize the first exit_count exits of a round.
+
+    Returns (discharges, ((destination, transfers), ...)) with destinations
+    in the order they first appear in the routing sequence.
+    """
+    discharges = 0
+    transfers: dict[DepartmentId, int] = {}
+    for exit_index in range(exit_count):
+        dest = get_exit_destination(dept, exit_index)
+        if dest is None:
+            discharges += 1
+        else:
+            transfers[dest] = transfers.get(dest, 0) + 1
+    return discharges, tuple(transfers.items())
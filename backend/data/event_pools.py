@@ -11,7 +11,7 @@ card text once physical deck is encoded.
 from models.enums import DepartmentId
 from models.events import EventCard, EventEffect
 
-ER_EVENTS: list[EventCard] = [
+ER_EVENTS: tuple[EventCard, ...] = (
     EventCard(
         id="er_1",
         department=DepartmentId.ER,
@@ -48,9 +48,9 @@ ER_EVENTS: list[EventCard] = [
         description="Equipment malfunction — 1 bed out of service this round",
         effect=EventEffect(bed_reduction=1),
     ),
-]
+)
 
-SURGERY_EVENTS: list[EventCard] = [
+SURGERY_EVENTS: tuple[EventCard, ...] = (
     EventCard(
         id="surg_1",
         department=DepartmentId.SURGERY,
@@ -87,9 +87,9 @@ SURGERY_EVENTS: list[EventCard] = [
         description="Additional surgical case arrives — 1 extra arrival",
         effect=EventEffect(additional_arrivals=1),
     ),
-]
+)
 
-CC_EVENTS: list[EventCard] = [
+CC_EVENTS: tuple[EventCard, ...] = (
     EventCard(
         id="cc_1",
         department=DepartmentId.CRITICAL_CARE,
@@ -126,9 +126,9 @@ CC_EVENTS: list[EventCard] = [
         description="Transfer from another hospital — 1 additional arrival",
         effect=EventEffect(additional_arrivals=1),
     ),
-]
+)
 
-SD_EVENTS: list[EventCard] = [
+SD_EVENTS: tuple[EventCard, ...] = (
     EventCard(
         id="sd_1",
         department=DepartmentId.STEP_DOWN,
@@ -165,11 +165,15 @@ SD_EVENTS: list[EventCard] = [
         description="Patient readmission — 1 additional arrival",
         effect=EventEffect(additional_arrivals=1),
     ),
-]
+)
 
-EVENT_POOLS: dict[DepartmentId, list[EventCard]] = {
+EVENT_POOLS: dict[DepartmentId, tuple[EventCard, ...]] = {
     DepartmentId.ER: ER_EVENTS,
     DepartmentId.SURGERY: SURGERY_EVENTS,
     DepartmentId.CRITICAL_CARE: CC_EVENTS,
     DepartmentId.STEP_DOWN: SD_EVENTS,
 }
+
+EVENTS_BY_ID: dict[str, EventCard] = {
+    card.id: card for pool in EVENT_POOLS.values() for card in pool
+}
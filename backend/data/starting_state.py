@@ -1,5 +1,6 @@
 """Factory for creating the initial game state."""
 
+import functools
 import uuid
 
 from pydantic import BaseModel
@@ -78,6 +79,20 @@ def create_starting_state(
     if game_id is None:
         game_id = str(uuid.uuid4())
 
+    if config is None:
+        # Validating the cached dump builds fresh nested models ~2x faster than construction
+        return GameState.model_validate({**_default_state_data(), "game_id": game_id})
+    return _build_starting_state(game_id, config)
+
+
+@functools.lru_cache(maxsize=1)
+def _default_state_data() -> dict:
+    """model_dump() of the default starting state. Treat as read-only."""
+    return _build_starting_state("", None).model_dump()
+
+
+def _build_starting_state(game_id: str, config: CustomGameConfig | None) -> GameState:
+    """Construct the starting state model by model, applying *config* overrides."""
     departments = {}
     for dept_id, defaults in DEFAULTS.items():
         core_staff = defaults["core_staff"]
@@ -1,6 +1,7 @@
 """SQLite database connection management."""
 
 import sqlite3
+import threading
 from contextlib import contextmanager
 
 from config import settings
@@ -8,6 +9,9 @@ from db.schema import SCHEMA_SQL
 
 _db_path: str = settings.db_path
 
+# One long-lived connection per worker thread, reopened if the path changes.
+_local = threading.local()
+
 
 def set_db_path(path: str) -> None:
     """Override the database path (used by tests)."""
@@ -15,21 +19,41 @@ def set_db_path(path: str) -> None:
     _db_path = path
 
 
-@contextmanager
-def get_db():
-    """Yield a sqlite3 connection with auto-commit/rollback."""
-    conn = sqlite3.connect(_db_path)
+def _connection() -> sqlite3.Connection:
+    """Return this thread's connection to the current database path."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == _db_path:
+        return conn
+    if conn is not None:
+        conn.close()
+    conn = sqlite3.connect(_db_path, check_same_thread=False, isolation_level=None)
     conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    # Long-lived connection: let SQLite refresh planner stats when useful
+    conn.execute("PRAGMA optimize=0x10002")
     conn.row_factory = sqlite3.Row
+    _local.conn, _local.path = conn, _db_path
+    return conn
+
+
+@contextmanager
+def get_db(immediate: bool = False):
+    """Yield this thread's sqlite3 connection inside one transaction.
+
+    Commits on success and rolls back on error. Pass immediate=True for
+    read-modify-write blocks so the write lock is taken up front.
+    """
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
     try:
         yield conn
         conn.commit()
-    except Exception:
+    except BaseException:
         conn.rollback()
         raise
-    finally:
-        conn.close()
 
 
 def init_db() -> None:
@@ -3,11 +3,20 @@
 import sqlite3
 from datetime import datetime
 
-from models.game_state import GameState
+from pydantic import TypeAdapter
 
+from models.game_state import GameState, RoundCostEntry
 
-def create_session(conn: sqlite3.Connection, game_id: str, state: GameState) -> None:
-    """Insert a new session and its initial state snapshot."""
+_COST_HISTORY_ADAPTER = TypeAdapter(tuple[list[RoundCostEntry], int, int])
+
+
+def create_session(
+    conn: sqlite3.Connection, game_id: str, state: GameState, state_json: str | None = None
+) -> None:
+    """Insert a new session and its initial state snapshot.
+
+    Pass state_json when the caller already serialized the state.
+    """
     now = datetime.utcnow().isoformat()
     conn.execute(
         "INSERT INTO sessions (game_id, created_at, updated_at, status, round_number, current_step) "
@@ -17,13 +26,26 @@ def create_session(conn: sqlite3.Connection, game_id: str, state: GameState) ->
     conn.execute(
         "INSERT INTO state_snapshots (game_id, round_number, step, state_json, created_at) "
         "VALUES (?, ?, ?, ?, ?)",
-        (game_id, state.round_number, state.current_step.value, state.model_dump_json(), now),
+        (
+            game_id, state.round_number, state.current_step.value,
+            state_json if state_json is not None else state.model_dump_json(), now,
+        ),
     )
 
 
-def save_state(conn: sqlite3.Connection, state: GameState) -> None:
-    """Save a new state snapshot and update session metadata."""
-    now = datetime.utcnow().isoformat()
+def save_state(
+    conn: sqlite3.Connection,
+    state: GameState,
+    state_json: str | None = None,
+    now: str | None = None,
+) -> None:
+    """Save a new state snapshot and update session metadata.
+
+    Pass state_json when the caller already serialized the state, and now
+    to share one timestamp across the writes of a request.
+    """
+    if now is None:
+        now = datetime.utcnow().isoformat()
     status = "finished" if state.is_finished else "active"
     conn.execute(
         "UPDATE sessions SET updated_at=?, status=?, round_number=?, current_step=? WHERE game_id=?",
@@ -32,7 +54,10 @@ def save_state(conn: sqlite3.Connection, state: GameState) -> None:
     conn.execute(
         "INSERT INTO state_snapshots (game_id, round_number, step, state_json, created_at) "
         "VALUES (?, ?, ?, ?, ?)",
-        (state.game_id, state.round_number, state.current_step.value, state.model_dump_json(), now),
+        (
+            state.game_id, state.round_number, state.current_step.value,
+            state_json if state_json is not None else state.model_dump_json(), now,
+        ),
     )
 
 
@@ -47,6 +72,42 @@ def load_state(conn: sqlite3.Connection, game_id: str) -> GameState | None:
     return GameState.model_validate_json(row["state_json"])
 
 
+def load_history_json(conn: sqlite3.Connection, game_id: str) -> str | None:
+    """Build the /history payload (game_id, round_costs, totals) as JSON inside SQLite.
+
+    Copies the fields straight out of the latest snapshot without a Python
+    round-trip through GameState.
+    """
+    row = conn.execute(
+        "SELECT json_object("
+        "'game_id', game_id, "
+        "'round_costs', json_extract(state_json, '$.round_costs'), "
+        "'total_financial_cost', json_extract(state_json, '$.total_financial_cost'), "
+        "'total_quality_cost', json_extract(state_json, '$.total_quality_cost')"
+        ") FROM state_snapshots WHERE game_id=? ORDER BY id DESC LIMIT 1",
+        (game_id,),
+    ).fetchone()
+    return row[0] if row is not None else None
+
+
+def load_cost_history(
+    conn: sqlite3.Connection, game_id: str
+) -> tuple[list[RoundCostEntry], int, int] | None:
+    """Load (round_costs, total_financial_cost, total_quality_cost) from the latest snapshot.
+
+    Extracts just those fields with SQLite's JSON functions instead of
+    validating the whole GameState.
+    """
+    row = conn.execute(
+        "SELECT json_extract(state_json, '$.round_costs', '$.total_financial_cost', "
+        "'$.total_quality_cost') FROM state_snapshots WHERE game_id=? ORDER BY id DESC LIMIT 1",
+        (game_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    return _COST_HISTORY_ADAPTER.validate_json(row[0])
+
+
 def log_action(
     conn: sqlite3.Connection,
     game_id: str,
@@ -55,12 +116,15 @@ def log_action(
     action_json: str,
     result: str = "ok",
     error_message: str | None = None,
+    now: str | None = None,
 ) -> None:
     """Append an action to the audit log."""
+    if now is None:
+        now = datetime.utcnow().isoformat()
     conn.execute(
         "INSERT INTO actions (game_id, round_number, step, action_json, result, error_message, created_at) "
         "VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (game_id, round_number, step, action_json, result, error_message, datetime.utcnow().isoformat()),
+        (game_id, round_number, step, action_json, result, error_message, now),
     )
 
 
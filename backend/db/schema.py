@@ -31,5 +31,7 @@ CREATE TABLE IF NOT EXISTS actions (
 );
 
 CREATE INDEX IF NOT EXISTS idx_snapshots_game ON state_snapshots(game_id);
+CREATE INDEX IF NOT EXISTS idx_snapshots_game_step_round
+    ON state_snapshots(game_id, step, round_number);
 CREATE INDEX IF NOT EXISTS idx_actions_game ON actions(game_id);
 """
@@ -9,6 +9,16 @@ from models.department import DepartmentState
 from models.game_state import GameState, RoundCostEntry
 from models.cost import CostConstants
 
+# Per-department detail keys, built once instead of formatted on every call
+_DETAIL_KEYS = {
+    dept_id: tuple(
+        f"{dept_id.value}_{name}_{kind}"
+        for name in ("arrivals_waiting", "requests_waiting", "extra_staff")
+        for kind in ("fin", "qual")
+    )
+    for dept_id in DepartmentId
+}
+
 
 def calculate_department_cost(dept: DepartmentState, c: CostConstants | None = None) -> tuple[int, int, dict[str, int]]:
     """Calculate financial and quality cost for one department this round.
@@ -21,6 +31,11 @@ def calculate_department_cost(dept: DepartmentState, c: CostConstants | None = N
     financial = 0
     quality = 0
     details: dict[str, int] = {}
+    (
+        arrivals_fin_key, arrivals_qual_key,
+        requests_fin_key, requests_qual_key,
+        extra_fin_key, extra_qual_key,
+    ) = _DETAIL_KEYS[dept.id]
 
     if dept.id == DepartmentId.ER:
         # Patients waiting (walk-ins waiting for admission)
@@ -38,17 +53,18 @@ def calculate_department_cost(dept: DepartmentState, c: CostConstants | None = N
             q = dept.arrivals_waiting * c.arrivals_waiting_quality
             financial += f
             quality += q
-            details[f"{dept.id.value}_arrivals_waiting_fin"] = f
-            details[f"{dept.id.value}_arrivals_waiting_qual"] = q
+            details[arrivals_fin_key] = f
+            details[arrivals_qual_key] = q
 
         # Requests waiting (transfers waiting to be accepted)
-        if dept.total_requests_waiting > 0:
-            f = dept.total_requests_waiting * c.requests_waiting_financial
-            q = dept.total_requests_waiting * c.requests_waiting_quality
+        requests_waiting = dept.total_requests_waiting
+        if requests_waiting > 0:
+            f = requests_waiting * c.requests_waiting_financial
+            q = requests_waiting * c.requests_waiting_quality
             financial += f
             quality += q
-            details[f"{dept.id.value}_requests_waiting_fin"] = f
-            details[f"{dept.id.value}_requests_waiting_qual"] = q
+            details[requests_fin_key] = f
+            details[requests_qual_key] = q
 
     # Extra staff cost (all departments)
     # Only charge for extra staff that are actually on duty
@@ -59,8 +75,8 @@ def calculate_department_cost(dept: DepartmentState, c: CostConstants | None = N
         q = extra_on_duty * c.extra_staff_quality
         financial += f
         quality += q
-        details[f"{dept.id.value}_extra_staff_fin"] = f
-        details[f"{dept.id.value}_extra_staff_qual"] = q
+        details[extra_fin_key] = f
+        details[extra_qual_key] = q
 
     return financial, quality, details
 
@@ -11,6 +11,14 @@ from models.events import ActiveEvent
 from models.game_state import GameState
 from data.event_pools import EVENT_POOLS
 
+# (dept, ((card, rounds_remaining), ...)) in draw order; permanent events never expire
+_DRAW_POOLS = tuple(
+    (dept_id, tuple(
+        (card, None if card.effect.staff_unavailable_permanent else 1) for card in pool
+    ))
+    for dept_id, pool in EVENT_POOLS.items()
+)
+
 
 def is_event_round(round_number: int) -> bool:
     return round_number in EVENT_ROUNDS
@@ -30,9 +38,9 @@ def draw_events(
     rng = random.Random(seed)
     drawn: dict[DepartmentId, ActiveEvent] = {}
 
-    for dept_id, pool in EVENT_POOLS.items():
-        card = rng.choice(pool)
-        rounds_remaining = None if card.effect.staff_unavailable_permanent else 1
+    for dept_id, pool in _DRAW_POOLS:
+        # One rng.choice per department keeps seeded draws reproducible
+        card, rounds_remaining = rng.choice(pool)
         drawn[dept_id] = ActiveEvent(
             event_id=card.id,
             description=card.description,
@@ -76,6 +84,8 @@ def tick_events(state: GameState) -> GameState:
     Called during Step 5 (Paperwork).
     """
     for dept in state.departments.values():
+        if not dept.active_events:
+            continue
         remaining_events: list[ActiveEvent] = []
         for event in dept.active_events:
             if event.rounds_remaining is None:
@@ -96,6 +106,7 @@ def tick_events(state: GameState) -> GameState:
                     if not effect.staff_unavailable_permanent:
                         dept.bed_capacity += effect.bed_reduction
 
-        dept.active_events = remaining_events
+        # In place, skipping pydantic's field assignment
+        dept.active_events[:] = remaining_events
 
     return state
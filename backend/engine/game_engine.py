@@ -9,7 +9,10 @@ This is the main entry point for game operations. It:
 
 from models.enums import StepType, STEP_ORDER, DepartmentId
 from models.game_state import GameState
-from models.actions import ArrivalsAction, ExitsAction, ClosedAction, StaffingAction, CardOverrides
+from models.actions import (
+    ArrivalsAction, ExitsAction, ClosedAction, StaffingAction, CardOverrides,
+    AdmitDecision, AcceptTransferDecision, ExitRouting,
+)
 from data.starting_state import create_starting_state, CustomGameConfig
 from engine.event_handler import is_event_round, draw_events, apply_events
 from engine.step_arrivals import process_new_arrivals, mature_transfers, apply_arrivals_action, apply_arrival_overrides
@@ -153,7 +156,6 @@ def play_round_with_defaults(state: GameState, event_seed: int | None = None) ->
         if dept.bed_capacity is not None and not dept.has_hallway:
             admit_count = min(admit_count, dept.beds_available)
         if admit_count > 0:
-            from models.actions import AdmitDecision
             admissions.append(AdmitDecision(department=dept_id, admit_count=admit_count))
 
         # Accept all matured transfers
@@ -162,7 +164,6 @@ def play_round_with_defaults(state: GameState, event_seed: int | None = None) ->
             if dept.bed_capacity is not None and not dept.has_hallway:
                 accept_count = min(accept_count, dept.beds_available - admit_count)
             if accept_count > 0:
-                from models.actions import AcceptTransferDecision
                 accepts.append(AcceptTransferDecision(
                     department=dept_id, from_dept=from_dept, accept_count=accept_count
                 ))
@@ -172,7 +173,6 @@ def play_round_with_defaults(state: GameState, event_seed: int | None = None) ->
     ))
 
     # Step 2: Exits — walk out everyone (no transfers)
-    from models.actions import ExitRouting
     available_exits = get_available_exits(state)
     routings = []
     for dept_id, exit_count in available_exits.items():
@@ -22,19 +22,23 @@ from data.card_sequences import (
 )
 
 
+def _has_shift_change(dept) -> bool:
+    """True if a shift_change event blocks activity in this department this round."""
+    return bool(dept.active_events) and any(e.effect.shift_change for e in dept.active_events)
+
+
 def process_new_arrivals(state: GameState) -> GameState:
     """Add card-based arrivals to waiting queues. Called before player decisions."""
     rn = state.round_number
     idx = rn - 1
-
-    # Check for shift_change event (no activity this round)
-    def has_shift_change(dept_id: DepartmentId) -> bool:
-        dept = state.departments[dept_id]
-        return any(e.effect.shift_change for e in dept.active_events)
+    depts = state.departments
+    er = depts[DepartmentId.ER]
+    surg = depts[DepartmentId.SURGERY]
+    cc = depts[DepartmentId.CRITICAL_CARE]
+    sd = depts[DepartmentId.STEP_DOWN]
 
     # ER walk-ins (always arrive)
-    if not has_shift_change(DepartmentId.ER):
-        er = state.departments[DepartmentId.ER]
+    if not _has_shift_change(er):
         walkins = get_er_walkin(rn)
         er.arrivals_waiting += walkins
 
@@ -48,18 +52,15 @@ def process_new_arrivals(state: GameState) -> GameState:
             state.ambulances_diverted_this_round = 0
 
     # Surgery arrivals
-    if not has_shift_change(DepartmentId.SURGERY):
-        surg = state.departments[DepartmentId.SURGERY]
+    if not _has_shift_change(surg):
         surg.arrivals_waiting += SURGERY_ARRIVALS[idx]
 
     # Critical Care arrivals
-    if not has_shift_change(DepartmentId.CRITICAL_CARE):
-        cc = state.departments[DepartmentId.CRITICAL_CARE]
+    if not _has_shift_change(cc):
         cc.arrivals_waiting += CC_ARRIVALS[idx]
 
     # Step Down arrivals
-    if not has_shift_change(DepartmentId.STEP_DOWN):
-        sd = state.departments[DepartmentId.STEP_DOWN]
+    if not _has_shift_change(sd):
         sd.arrivals_waiting += SD_ARRIVALS[idx]
 
     return state
@@ -68,6 +69,8 @@ def process_new_arrivals(state: GameState) -> GameState:
 def mature_transfers(state: GameState) -> GameState:
     """Transfer patients directly to destination if staff available, else to requests_waiting."""
     for dept in state.departments.values():
+        if not dept.outgoing_transfers:
+            continue
         remaining_transfers = []
         for transfer in dept.outgoing_transfers:
             if transfer.rounds_remaining <= 1:
@@ -75,20 +78,22 @@ def mature_transfers(state: GameState) -> GameState:
                 _free_staff(dept, transfer.count)
                 _remove_patients_from_dept(dept, transfer.count)
                 
-                # Try to admit directly to destination if staff and space available
+                # Admit directly to destination while staff and space are available
                 dest = state.departments[transfer.to_dept]
-                for _ in range(transfer.count):
-                    if dest.staff.total_idle > 0 and (dest.has_hallway or dest.beds_available > 0):
-                        # Direct admission with free doctor
-                        _admit_patients(dest, 1)
-                    else:
-                        # No staff or space available, add to waiting queue
-                        current = dest.requests_waiting.get(transfer.from_dept, 0)
-                        dest.requests_waiting[transfer.from_dept] = current + 1
+                direct = min(transfer.count, max(0, dest.staff.total_idle))
+                if not dest.has_hallway:
+                    direct = min(direct, dest.beds_available)
+                _admit_patients(dest, direct)
+
+                # No staff or space available for the rest, add to waiting queue
+                waiting = transfer.count - direct
+                if waiting > 0:
+                    current = dest.requests_waiting.get(transfer.from_dept, 0)
+                    dest.requests_waiting[transfer.from_dept] = current + waiting
             else:
                 transfer.rounds_remaining -= 1
                 remaining_transfers.append(transfer)
-        dept.outgoing_transfers = remaining_transfers
+        dept.outgoing_transfers[:] = remaining_transfers
 
     return state
 
@@ -127,13 +132,11 @@ def get_card_arrivals_this_round(state: GameState) -> dict:
 
     rn = state.round_number
     idx = rn - 1
+    depts = state.departments
     result = {}
 
-    def has_shift_change(dept_id):
-        return any(e.effect.shift_change for e in state.departments[dept_id].active_events)
-
     # ER
-    if has_shift_change(DId.ER):
+    if _has_shift_change(depts[DId.ER]):
         result[DId.ER] = 0
     else:
         walkins = get_er_walkin(rn)
@@ -141,19 +144,19 @@ def get_card_arrivals_this_round(state: GameState) -> dict:
         result[DId.ER] = walkins + ambulance
 
     # Surgery
-    if has_shift_change(DId.SURGERY):
+    if _has_shift_change(depts[DId.SURGERY]):
         result[DId.SURGERY] = 0
     else:
         result[DId.SURGERY] = SURGERY_ARRIVALS[idx]
 
     # Critical Care
-    if has_shift_change(DId.CRITICAL_CARE):
+    if _has_shift_change(depts[DId.CRITICAL_CARE]):
         result[DId.CRITICAL_CARE] = 0
     else:
         result[DId.CRITICAL_CARE] = CC_ARRIVALS[idx]
 
     # Step Down
-    if has_shift_change(DId.STEP_DOWN):
+    if _has_shift_change(depts[DId.STEP_DOWN]):
         result[DId.STEP_DOWN] = 0
     else:
         result[DId.STEP_DOWN] = SD_ARRIVALS[idx]
@@ -203,18 +206,22 @@ def apply_arrivals_action(state: GameState, action: ArrivalsAction) -> GameState
 
 def _admit_patients(dept, count: int) -> None:
     """Place patients in beds (or hallway) and assign staff."""
-    for _ in range(count):
-        # Assign staff (core idle first, then extra idle)
-        if dept.staff.core_idle > 0:
-            dept.staff.core_busy += 1
-        else:
-            dept.staff.extra_busy += 1
-
-        # Place in bed or hallway
-        if dept.bed_capacity is not None and dept.patients_in_beds < dept.bed_capacity:
-            dept.patients_in_beds += 1
-        elif dept.has_hallway:
-            dept.patients_in_hallway += 1
-        else:
-            # Hard cap dept (surgery/CC) — should have been caught by validator
-            dept.patients_in_beds += 1
+    if count <= 0:
+        return
+
+    # Assign staff (core idle first, then extra idle)
+    core_take = min(count, max(0, dept.staff.core_idle))
+    dept.staff.core_busy += core_take
+    dept.staff.extra_busy += count - core_take
+
+    # Place in beds up to capacity, then hallway
+    beds_take = 0
+    if dept.bed_capacity is not None:
+        beds_take = min(count, max(0, dept.bed_capacity - dept.patients_in_beds))
+    dept.patients_in_beds += beds_take
+    overflow = count - beds_take
+    if dept.has_hallway:
+        dept.patients_in_hallway += overflow
+    else:
+        # Hard cap dept (surgery/CC) — should have been caught by validator
+        dept.patients_in_beds += overflow
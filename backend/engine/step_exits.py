@@ -12,7 +12,7 @@ from models.enums import DepartmentId
 from models.game_state import GameState
 from models.department import TransferRequest
 from models.actions import ExitsAction
-from data.card_sequences import get_exits, get_exit_routing
+from data.card_sequences import get_exits, get_exit_plan
 
 
 def get_available_exits(state: GameState) -> dict[DepartmentId, int]:
@@ -25,7 +25,7 @@ def get_available_exits(state: GameState) -> dict[DepartmentId, int]:
     for dept_id in state.departments:
         # Check for no_exits event
         dept = state.departments[dept_id]
-        has_no_exits = any(e.effect.no_exits for e in dept.active_events)
+        has_no_exits = bool(dept.active_events) and any(e.effect.no_exits for e in dept.active_events)
         if has_no_exits:
             exits[dept_id] = 0
         elif state.exit_overrides and dept_id in state.exit_overrides:
@@ -59,48 +59,31 @@ def apply_exits_action(state: GameState, action: ExitsAction) -> GameState:
             continue
 
         # Apply automatic routing based on department sequences
-        exit_index = 0  # tracks position in exit sequence
-        for _ in range(actual_exits):
-            routing_dest = get_exit_routing(routing.from_dept, exit_index)
-            exit_index += 1
-            
-            if routing_dest == "out":
-                # Discharge patient
-                if dept.patients_in_beds > 0:
-                    dept.patients_in_beds -= 1
-                elif dept.patients_in_hallway > 0:
-                    dept.patients_in_hallway -= 1
-                else:
-                    break
-                
-                # Free one staff member
-                if dept.staff.extra_busy > 0:
-                    dept.staff.extra_busy -= 1
-                elif dept.staff.core_busy > 0:
-                    dept.staff.core_busy -= 1
-            else:
-                # Transfer to another department
-                dest_id = None
-                if routing_dest == "stepdown":
-                    dest_id = DepartmentId.STEP_DOWN
-                elif routing_dest == "surgery":
-                    dest_id = DepartmentId.SURGERY
-                elif routing_dest == "criticalcare":
-                    dest_id = DepartmentId.CRITICAL_CARE
-                
-                if dest_id:
-                    # Create outgoing transfer (1-round delay)
-                    dept.outgoing_transfers.append(
-                        TransferRequest(
-                            from_dept=routing.from_dept,
-                            to_dept=dest_id,
-                            count=1,
-                            rounds_remaining=1,
-                        )
-                    )
-                    # Note: patient and staff stay in sending dept until accepted
+        discharges, transfers = get_exit_plan(routing.from_dept, actual_exits)
 
-    return state
+        if discharges:
+            # Discharge patients (beds first, then hallway); actual_exits caps
+            # this at total_patients, since transfers leave patients in place
+            from_beds = min(discharges, dept.patients_in_beds)
+            dept.patients_in_beds -= from_beds
+            dept.patients_in_hallway -= discharges - from_beds
+
+            # Free one staff member per discharge (extra first, then core)
+            extra_freed = min(discharges, dept.staff.extra_busy)
+            dept.staff.extra_busy -= extra_freed
+            dept.staff.core_busy -= min(discharges - extra_freed, dept.staff.core_busy)
+
+        # Transfer to other departments (1-round delay), one request per destination
+        for dest_id, count in transfers:
+            dept.outgoing_transfers.append(
+                TransferRequest(
+                    from_dept=routing.from_dept,
+                    to_dept=dest_id,
+                    count=count,
+                    rounds_remaining=1,
+                )
+            )
+            # Note: patients and staff stay in sending dept until accepted
 
     return state
 
@@ -3,11 +3,13 @@
 No deep copies or simulation — these are lightweight read-only queries.
 """
 
+import functools
+
 from models.enums import DepartmentId, EVENT_ROUNDS
 from models.department import DepartmentState
 from models.game_state import GameState
 from models.cost import CostConstants
-from data.card_sequences import get_arrivals, get_exits, get_er_ambulance
+from data.card_sequences import get_er_ambulance, get_schedule_window
 
 
 def department_utilization(dept: DepartmentState) -> dict:
@@ -50,21 +52,53 @@ def capacity_forecast(state: GameState, horizon: int) -> dict[str, list[dict]]:
     start = state.round_number
     end = min(start + horizon, 25)  # rounds are 1-24
 
-    result: dict[str, list[dict]] = {}
-    for dept_id in DepartmentId:
-        rounds = []
-        for rn in range(start, end):
-            arr = get_arrivals(dept_id, rn)
-            ext = get_exits(dept_id, rn)
-            rounds.append({
-                "round": rn,
-                "arrivals": arr,
-                "exits": ext,
-                "net_flow": arr - ext,
-            })
-        result[dept_id.value] = rounds
+    # (dept, round, [arrivals, exits]) as plain ints in one conversion
+    per_dept = get_schedule_window(start, end).transpose(1, 0, 2).tolist()
+    return {
+        dept_id.value: [
+            {"round": rn, "arrivals": arr, "exits": ext, "net_flow": arr - ext}
+            for rn, (arr, ext) in enumerate(rows, start)
+        ]
+        for dept_id, rows in zip(DepartmentId, per_dept)
+    }
 
-    return result
+
+@functools.lru_cache(maxsize=256)
+def _dept_risks(
+    dept: str,
+    bed_capacity: int | None,
+    has_hallway: bool,
+    patients_in_beds: int,
+    beds_available: int,
+    idle: int,
+    waiting: int,
+    requests: int,
+) -> tuple[tuple[str, str], ...]:
+    """(severity, reason) pairs for one department's counters."""
+    risks: list[tuple[str, str]] = []
+
+    # Bed overflow risk
+    if bed_capacity is not None and not has_hallway:
+        if patients_in_beds >= bed_capacity:
+            risks.append(("high", f"At bed capacity ({patients_in_beds}/{bed_capacity})"))
+        elif beds_available <= 2:
+            risks.append(("medium", f"Near bed capacity ({patients_in_beds}/{bed_capacity})"))
+
+    # Staff shortage
+    if idle == 0 and waiting > 0:
+        risks.append(("high", f"No idle staff with {waiting} patients waiting"))
+    elif idle < waiting:
+        risks.append(("medium", f"Only {idle} idle staff for {waiting} waiting patients"))
+
+    # Waiting buildup
+    if waiting > 3:
+        risks.append(("high", f"{waiting} patients waiting for admission"))
+
+    # Transfer requests piling up
+    if requests > 2:
+        risks.append(("medium", f"{requests} transfer requests pending"))
+
+    return tuple(risks)
 
 
 def bottleneck_detection(state: GameState) -> list[dict]:
@@ -72,58 +106,15 @@ def bottleneck_detection(state: GameState) -> list[dict]:
 
     Returns list of risk dicts with: department, severity (low/medium/high), reason.
     """
-    risks: list[dict] = []
-
-    for dept_id, dept in state.departments.items():
-        # Bed overflow risk
-        if dept.bed_capacity is not None and not dept.has_hallway:
-            if dept.patients_in_beds >= dept.bed_capacity:
-                risks.append({
-                    "department": dept_id.value,
-                    "severity": "high",
-                    "reason": f"At bed capacity ({dept.patients_in_beds}/{dept.bed_capacity})",
-                })
-            elif dept.beds_available <= 2:
-                risks.append({
-                    "department": dept_id.value,
-                    "severity": "medium",
-                    "reason": f"Near bed capacity ({dept.patients_in_beds}/{dept.bed_capacity})",
-                })
-
-        # Staff shortage
-        if dept.staff.total_idle == 0 and dept.arrivals_waiting > 0:
-            risks.append({
-                "department": dept_id.value,
-                "severity": "high",
-                "reason": f"No idle staff with {dept.arrivals_waiting} patients waiting",
-            })
-        elif dept.staff.total_idle < dept.arrivals_waiting:
-            risks.append({
-                "department": dept_id.value,
-                "severity": "medium",
-                "reason": (
-                    f"Only {dept.staff.total_idle} idle staff for "
-                    f"{dept.arrivals_waiting} waiting patients"
-                ),
-            })
-
-        # Waiting buildup
-        if dept.arrivals_waiting > 3:
-            risks.append({
-                "department": dept_id.value,
-                "severity": "high",
-                "reason": f"{dept.arrivals_waiting} patients waiting for admission",
-            })
-
-        # Transfer requests piling up
-        if dept.total_requests_waiting > 2:
-            risks.append({
-                "department": dept_id.value,
-                "severity": "medium",
-                "reason": f"{dept.total_requests_waiting} transfer requests pending",
-            })
-
-    return risks
+    return [
+        {"department": dept_id.value, "severity": severity, "reason": reason}
+        for dept_id, dept in state.departments.items()
+        for severity, reason in _dept_risks(
+            dept_id.value, dept.bed_capacity, dept.has_hallway, dept.patients_in_beds,
+            dept.beds_available, dept.staff.total_idle, dept.arrivals_waiting,
+            dept.total_requests_waiting,
+        )
+    ]
 
 
 def diversion_roi(state: GameState, rounds_ahead: int) -> dict:
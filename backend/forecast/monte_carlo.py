@@ -61,30 +61,28 @@ def run_monte_carlo(
             risk_flags=[],
         )
 
-    # Run M simulations with different seeds
-    financial_totals = []
-    quality_totals = []
-    all_results = []
+    # Run M simulations with different seeds; the engine steps each one, then
+    # all per-round snapshots are packed into one array for aggregation.
+    seeds = np.arange(num_simulations) + (base_seed or 0)
+    all_results = [
+        run_lookahead(state, horizon, policy=policy, event_seed=int(seed))
+        for seed in seeds
+    ]
 
-    for i in range(num_simulations):
-        seed = (base_seed + i) if base_seed is not None else i
-        result = run_lookahead(state, horizon, policy=policy, event_seed=seed)
-        financial_totals.append(result.total_financial)
-        quality_totals.append(result.total_quality)
-        all_results.append(result)
-
-    fin_arr = np.array(financial_totals, dtype=np.float64)
-    qual_arr = np.array(quality_totals, dtype=np.float64)
+    fin_arr = np.fromiter((r.total_financial for r in all_results), np.float64, num_simulations)
+    qual_arr = np.fromiter((r.total_quality for r in all_results), np.float64, num_simulations)
 
     # Compute percentiles
     p10_f, p50_f, p90_f = np.percentile(fin_arr, [10, 50, 90])
     p10_q, p50_q, p90_q = np.percentile(qual_arr, [10, 50, 90])
 
+    stacked = _stack_results(all_results) if any(r.snapshots for r in all_results) else None
+
     # Average snapshots across simulations
-    expected_snapshots = _average_snapshots(all_results)
+    expected_snapshots = _average_snapshots(all_results, stacked)
 
     # Detect risk flags
-    risk_flags = _detect_risk_flags(all_results, state)
+    risk_flags = _detect_risk_flags(all_results, state, stacked)
 
     return MonteCarloResult(
         num_simulations=num_simulations,
@@ -102,105 +100,106 @@ def run_monte_carlo(
     )
 
 
-def _average_snapshots(results: list) -> list[RoundSnapshot]:
+_SNAPSHOT_FIELDS = (
+    "census", "arrivals_waiting", "requests_waiting",
+    "beds_available", "idle_staff", "extra_staff",
+)
+_CENSUS, _ARRIVALS, _REQUESTS, _BEDS, _IDLE, _EXTRA = range(len(_SNAPSHOT_FIELDS))
+_DEPT_KEYS = tuple(d.value for d in DepartmentId)
+_DEPT_INDEX = {d: i for i, d in enumerate(DepartmentId)}
+
+
+def _stack_results(results: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pack simulation snapshots into dense arrays.
+
+    Returns (depts, costs, mask): depts is (sims, rounds, depts, fields),
+    costs is (sims, rounds, 4) of round/cumulative financial/quality, and
+    mask flags which (sim, round) cells hold a real snapshot.
+    """
+    num_sims = len(results)
+    num_rounds = max(len(res.snapshots) for res in results)
+    depts = np.zeros(
+        (num_sims, num_rounds, len(_DEPT_KEYS), len(_SNAPSHOT_FIELDS)), dtype=np.float64,
+    )
+    costs = np.zeros((num_sims, num_rounds, 4), dtype=np.float64)
+    mask = np.zeros((num_sims, num_rounds), dtype=bool)
+
+    for s_idx, res in enumerate(results):
+        for r_idx, snap in enumerate(res.snapshots):
+            mask[s_idx, r_idx] = True
+            costs[s_idx, r_idx] = (
+                snap.round_financial, snap.round_quality,
+                snap.cumulative_financial, snap.cumulative_quality,
+            )
+            row = depts[s_idx, r_idx]
+            for d_idx, dk in enumerate(_DEPT_KEYS):
+                d = snap.departments.get(dk)
+                if d is not None:
+                    row[d_idx] = (
+                        d.census, d.arrivals_waiting, d.requests_waiting,
+                        d.beds_available, d.idle_staff, d.extra_staff,
+                    )
+    return depts, costs, mask
+
+
+def _average_snapshots(results: list, stacked: tuple | None = None) -> list[RoundSnapshot]:
     """Average per-round snapshots across all simulation results."""
     if not results or not results[0].snapshots:
         return []
 
-    num_sims = len(results)
+    depts, costs, mask = stacked if stacked is not None else _stack_results(results)
     num_rounds = len(results[0].snapshots)
-    dept_keys = list(results[0].snapshots[0].departments.keys()) if results[0].snapshots else []
+    dept_keys = list(results[0].snapshots[0].departments.keys())
+
+    valid = mask[:, :num_rounds].sum(axis=0).astype(np.float64)
+    avg_depts = np.rint(depts[:, :num_rounds].sum(axis=0) / valid[:, None, None]).astype(int)
+    avg_costs = np.rint(costs[:, :num_rounds].sum(axis=0) / valid[:, None]).astype(int)
 
     averaged: list[RoundSnapshot] = []
     for r_idx in range(num_rounds):
-        # Accumulate across simulations
-        round_fin = 0.0
-        round_qual = 0.0
-        cum_fin = 0.0
-        cum_qual = 0.0
-        dept_accum: dict[str, dict[str, float]] = {
-            dk: {
-                "census": 0.0, "arrivals_waiting": 0.0, "requests_waiting": 0.0,
-                "beds_available": 0.0, "idle_staff": 0.0, "extra_staff": 0.0,
-            }
-            for dk in dept_keys
-        }
-
-        valid_sims = 0
-        for res in results:
-            if r_idx >= len(res.snapshots):
-                continue
-            snap = res.snapshots[r_idx]
-            round_fin += snap.round_financial
-            round_qual += snap.round_quality
-            cum_fin += snap.cumulative_financial
-            cum_qual += snap.cumulative_quality
-            valid_sims += 1
-
-            for dk in dept_keys:
-                if dk in snap.departments:
-                    d = snap.departments[dk]
-                    dept_accum[dk]["census"] += d.census
-                    dept_accum[dk]["arrivals_waiting"] += d.arrivals_waiting
-                    dept_accum[dk]["requests_waiting"] += d.requests_waiting
-                    dept_accum[dk]["beds_available"] += d.beds_available
-                    dept_accum[dk]["idle_staff"] += d.idle_staff
-                    dept_accum[dk]["extra_staff"] += d.extra_staff
-
-        if valid_sims == 0:
-            continue
-
-        avg_depts: dict[str, DepartmentSnapshot] = {}
-        for dk in dept_keys:
-            avg_depts[dk] = DepartmentSnapshot(
-                census=round(dept_accum[dk]["census"] / valid_sims),
-                arrivals_waiting=round(dept_accum[dk]["arrivals_waiting"] / valid_sims),
-                requests_waiting=round(dept_accum[dk]["requests_waiting"] / valid_sims),
-                beds_available=round(dept_accum[dk]["beds_available"] / valid_sims),
-                idle_staff=round(dept_accum[dk]["idle_staff"] / valid_sims),
-                extra_staff=round(dept_accum[dk]["extra_staff"] / valid_sims),
-            )
-
-        # Use round number from first result
-        rn = results[0].snapshots[r_idx].round_number
-
+        dept_rows = avg_depts[r_idx].tolist()
+        round_fin, round_qual, cum_fin, cum_qual = avg_costs[r_idx].tolist()
         averaged.append(RoundSnapshot(
-            round_number=rn,
-            departments=avg_depts,
-            round_financial=round(round_fin / valid_sims),
-            round_quality=round(round_qual / valid_sims),
-            cumulative_financial=round(cum_fin / valid_sims),
-            cumulative_quality=round(cum_qual / valid_sims),
+            round_number=results[0].snapshots[r_idx].round_number,
+            departments={
+                dk: DepartmentSnapshot(**dict(zip(
+                    _SNAPSHOT_FIELDS, dept_rows[_DEPT_INDEX[DepartmentId(dk)]],
+                )))
+                for dk in dept_keys
+            },
+            round_financial=round_fin,
+            round_quality=round_qual,
+            cumulative_financial=cum_fin,
+            cumulative_quality=cum_qual,
         ))
 
     return averaged
 
 
-def _detect_risk_flags(results: list, state: GameState) -> list[str]:
+def _detect_risk_flags(
+    results: list, state: GameState, stacked: tuple | None = None,
+) -> list[str]:
     """Detect risk conditions that occur in a significant fraction of simulations."""
     if not results:
         return []
+    if not any(res.snapshots for res in results):
+        return []
 
+    depts, _, mask = stacked if stacked is not None else _stack_results(results)
     num_sims = len(results)
     flags: list[str] = []
+    live = mask[:, :, None]
+
+    def sim_fraction(hit: np.ndarray) -> np.ndarray:
+        """Fraction of sims where the (sims, rounds, depts) condition ever holds."""
+        return (hit & live).any(axis=1).sum(axis=0) / num_sims
 
     # Check for bed overflow in hard-cap departments (Surgery, CC)
+    overflow = sim_fraction(depts[..., _BEDS] <= 0)
     for dept_id in [DepartmentId.SURGERY, DepartmentId.CRITICAL_CARE]:
-        dept = state.departments[dept_id]
-        if dept.bed_capacity is None:
+        if state.departments[dept_id].bed_capacity is None:
             continue
-
-        overflow_count = 0
-        for res in results:
-            for snap in res.snapshots:
-                dk = dept_id.value
-                if dk in snap.departments:
-                    d = snap.departments[dk]
-                    if d.beds_available <= 0:
-                        overflow_count += 1
-                        break  # count this sim once
-
-        pct = overflow_count / num_sims
+        pct = overflow[_DEPT_INDEX[dept_id]]
         if pct > 0.5:
             flags.append(
                 f"{dept_id.value}: bed capacity reached in {pct:.0%} of simulations"
@@ -211,36 +210,18 @@ def _detect_risk_flags(results: list, state: GameState) -> list[str]:
             )
 
     # Check for high waiting counts
+    high_waiting = sim_fraction(depts[..., _ARRIVALS] > 5)
     for dept_id in DepartmentId:
-        high_waiting_count = 0
-        for res in results:
-            for snap in res.snapshots:
-                dk = dept_id.value
-                if dk in snap.departments:
-                    d = snap.departments[dk]
-                    if d.arrivals_waiting > 5:
-                        high_waiting_count += 1
-                        break
-
-        pct = high_waiting_count / num_sims
+        pct = high_waiting[_DEPT_INDEX[dept_id]]
         if pct > 0.5:
             flags.append(
                 f"{dept_id.value}: high waiting patients (>5) in {pct:.0%} of simulations"
             )
 
     # Check for staff shortage
+    shortage = sim_fraction((depts[..., _IDLE] == 0) & (depts[..., _ARRIVALS] > 0))
     for dept_id in DepartmentId:
-        shortage_count = 0
-        for res in results:
-            for snap in res.snapshots:
-                dk = dept_id.value
-                if dk in snap.departments:
-                    d = snap.departments[dk]
-                    if d.idle_staff == 0 and d.arrivals_waiting > 0:
-                        shortage_count += 1
-                        break
-
-        pct = shortage_count / num_sims
+        pct = shortage[_DEPT_INDEX[dept_id]]
         if pct > 0.3:
             flags.append(
                 f"{dept_id.value}: staff shortage risk in {pct:.0%} of simulations"
@@ -22,6 +22,8 @@ from forecast.monte_carlo import run_monte_carlo
 DEFAULT_HORIZON = 6
 MC_SIMS_FULL = 100
 MC_SIMS_PRUNE = 50
+# Shortlisted candidates re-scored with the full Monte Carlo run after screening
+MC_FULL_TOP_K = 2
 
 
 def optimize_step(
@@ -29,6 +31,7 @@ def optimize_step(
     horizon: int = DEFAULT_HORIZON,
     mc_simulations: int = MC_SIMS_FULL,
     base_seed: int | None = None,
+    screen_simulations: int | None = None,
 ) -> OptimizationResult:
     """Generate and rank candidate actions for the current step.
 
@@ -36,8 +39,11 @@ def optimize_step(
     1. Generate candidates for current step
     2. Score all with deterministic lookahead (fast)
     3. Prune to top 4
-    4. Score survivors with Monte Carlo for confidence intervals
-    5. Rank by expected total cost (financial + quality)
+    4. Screen survivors with a short Monte Carlo run (screen_simulations,
+       default max(10, mc_simulations // 10))
+    5. Re-score the best MC_FULL_TOP_K with the full mc_simulations run;
+       the rest keep their screening estimates
+    6. Rank by expected total cost (financial + quality)
     """
     step = state.current_step
 
@@ -86,16 +92,38 @@ def optimize_step(
     # Prune to top 4
     top = scored[:4]
 
-    # Phase 2: MC scoring for survivors
-    final_candidates: list[ScoredCandidate] = []
-    for desc, action, det_total, det_result in top:
+    # Phase 2: short MC screen for survivors, full MC only for the front-runners.
+    # Both runs use the same seeds, so the screen is a prefix of the full run.
+    if screen_simulations is None:
+        screen_simulations = max(10, mc_simulations // 10)
+    if len(top) <= MC_FULL_TOP_K:
+        screen_simulations = mc_simulations  # everyone gets the full run anyway
+    screen_simulations = min(screen_simulations, mc_simulations)
+
+    screened = []
+    for desc, action, _det_total, _det_result in top:
         policy = _make_policy_with_override(state, step, action)
         mc = run_monte_carlo(
             state, horizon,
-            num_simulations=mc_simulations,
+            num_simulations=screen_simulations,
             policy=policy,
             base_seed=base_seed,
         )
+        screened.append((desc, action, policy, mc))
+
+    if screen_simulations < mc_simulations:
+        screened.sort(key=lambda x: x[3].expected_financial + x[3].expected_quality)
+        for i, (desc, action, policy, _mc) in enumerate(screened[:MC_FULL_TOP_K]):
+            mc = run_monte_carlo(
+                state, horizon,
+                num_simulations=mc_simulations,
+                policy=policy,
+                base_seed=base_seed,
+            )
+            screened[i] = (desc, action, policy, mc)
+
+    final_candidates: list[ScoredCandidate] = []
+    for desc, action, _policy, mc in screened:
         expected_total = mc.expected_financial + mc.expected_quality
         p10_total = mc.p10_financial + mc.p10_quality
         p90_total = mc.p90_financial + mc.p90_quality
@@ -130,12 +158,16 @@ def _make_policy_with_override(
     override_action,
 ) -> ActionPolicy:
     """Create a policy that uses the override action for the first occurrence
-    of override_step, then falls back to default_policy."""
-    used = [False]
+    of override_step, then falls back to default_policy.
+
+    Simulations start at the current step, so the first occurrence is the one
+    in the starting round. Keying on the round keeps the policy stateless and
+    reusable across Monte Carlo runs.
+    """
+    start_round = state.round_number
 
     def policy(sim_state: GameState, step: StepType):
-        if step == override_step and not used[0]:
-            used[0] = True
+        if step == override_step and sim_state.round_number == start_round:
             return override_action
         return default_policy(sim_state, step)
 
@@ -13,14 +13,18 @@ from fastapi.responses import JSONResponse
 
 from config import settings
 from db.database import init_db
-from api.routes_game import router as game_router
+from agent.llm_client import LLMClient, aclose_http_clients
+from api.routes_game import router as game_router, _JSONResponse
 from api.routes_forecast import router as forecast_router
 from api.routes_recommend import router as recommend_router
 from api.routes_chat import router as chat_router
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="WHOP — Workflow-guided Hospital Outcomes Platform")
+app = FastAPI(
+    title="WHOP — Workflow-guided Hospital Outcomes Platform",
+    default_response_class=_JSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +53,12 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.on_event("startup")
 def startup():
     init_db()
+    LLMClient().warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await aclose_http_clients()
 
 
 @app.get("/health")
@@ -28,7 +28,8 @@ class StaffState(BaseModel):
     def total_idle(self) -> int:
         available_core = self.core_total - self.core_busy
         unavail_from_core = min(self.unavailable, available_core)
-        return (available_core - unavail_from_core) + self.extra_idle
+        # extra_idle inlined; this is read on every admission decision
+        return (available_core - unavail_from_core) + (self.extra_total - self.extra_busy)
 
     @property
     def total_busy(self) -> int:
@@ -18,14 +18,14 @@ class StepType(str, Enum):
 
 
 # Ordered step sequence for round progression
-STEP_ORDER = [
+STEP_ORDER = (
     StepType.EVENT,
     StepType.ARRIVALS,
     StepType.EXITS,
     StepType.CLOSED,
     StepType.STAFFING,
     StepType.PAPERWORK,
-]
+)
 
 # Rounds at which events occur (before Step 1)
-EVENT_ROUNDS = {6, 9, 12, 17, 21}
+EVENT_ROUNDS = frozenset({6, 9, 12, 17, 21})
@@ -1,14 +1,19 @@
 """Tests for Phase 4: LLM Agent (prompt builder, output parser, LLM client, recommender)."""
 
+import asyncio
+import copy
 import json
 import sys
+from dataclasses import asdict
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+import httpx
 import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from config import settings
 from data.starting_state import create_starting_state
 from models.enums import StepType, DepartmentId
 from models.actions import (
@@ -16,14 +21,17 @@ from models.actions import (
     AdmitDecision, ExitRouting,
 )
 from models.recommendations import ScoredCandidate, OptimizationResult
-from agent.llm_client import LLMClient, LLMClientError, LLMResponse
+from agent import llm_client
+from agent.llm_client import LLMClient, LLMClientError, LLMResponse, _strip_thinking
 from agent.prompt_builder import SYSTEM_PROMPT, build_user_prompt
+from agent.chat_prompt import build_chat_context
 from agent.output_parser import (
     parse_llm_response, build_fallback_recommendation,
     ParseError, ParsedRecommendation,
 )
 from agent.recommender import Recommender, RecommendationResponse
 from engine.game_engine import process_event_step
+from forecast.optimizer import optimize_step
 
 
 @pytest.fixture
@@ -133,6 +141,26 @@ class TestPromptBuilder:
         assert "idle" in prompt.lower()
         assert "extra" in prompt.lower()
 
+    def test_user_prompt_cached_until_candidates_change(self, game_at_arrivals, sample_optimization):
+        first = build_user_prompt(game_at_arrivals, StepType.ARRIVALS, sample_optimization, 6)
+        assert build_user_prompt(game_at_arrivals, StepType.ARRIVALS, sample_optimization, 6) is first
+        sample_optimization.candidates[0].reasoning = "changed reasoning"
+        second = build_user_prompt(game_at_arrivals, StepType.ARRIVALS, sample_optimization, 6)
+        assert "changed reasoning" in second
+
+
+class TestChatContext:
+    def test_context_reused_for_same_state(self, game_at_arrivals):
+        first = build_chat_context(game_at_arrivals)
+        assert build_chat_context(game_at_arrivals) is first
+
+    def test_context_rebuilt_when_state_changes(self, game_at_arrivals):
+        first = build_chat_context(game_at_arrivals)
+        game_at_arrivals.departments[DepartmentId.ER].arrivals_waiting += 5
+        second = build_chat_context(game_at_arrivals)
+        assert second is not first
+        assert second != first
+
 
 # ── TestOutputParser ─────────────────────────────────────────────────────
 
@@ -208,6 +236,39 @@ class TestOutputParser:
         assert isinstance(result.action, ArrivalsAction)
         assert result.reasoning == "preamble test"
 
+    def test_extract_ignores_braces_in_strings_and_trailing_text(self):
+        raw = 'Plan {draft}:\n{"reasoning": "keep } and { quoted", "action": {"admissions": []}} -- end {x}'
+        result = parse_llm_response(raw, StepType.ARRIVALS)
+        assert result.reasoning == "keep } and { quoted"
+
+    def test_invalid_items_skipped_without_raising(self):
+        raw = json.dumps({"action": {
+            "admissions": [
+                {"department": "er", "admit_count": "2"},
+                {"department": "nowhere", "admit_count": 1},
+                {"department": "surgery", "admit_count": "lots"},
+                "not a dict",
+            ],
+        }})
+        result = parse_llm_response(raw, StepType.ARRIVALS)
+        assert [(a.department, a.admit_count) for a in result.action.admissions] == [
+            (DepartmentId.ER, 2)
+        ]
+
+    def test_malformed_numeric_strings_skipped(self):
+        raw = json.dumps({"action": {
+            "admissions": [
+                {"department": "er", "admit_count": "+-3"},
+                {"department": "surgery", "admit_count": "-+1"},
+                {"department": "cc", "admit_count": "\u00b2"},
+                {"department": "sd", "admit_count": " +4 "},
+            ],
+        }})
+        result = parse_llm_response(raw, StepType.ARRIVALS)
+        assert [(a.department, a.admit_count) for a in result.action.admissions] == [
+            (DepartmentId.STEP_DOWN, 4)
+        ]
+
     def test_invalid_json_raises_parse_error(self):
         raw = "This is not valid JSON at all."
         with pytest.raises(ParseError):
@@ -240,6 +301,16 @@ class TestOutputParser:
 
 
 class TestLLMClient:
+    @pytest.fixture(autouse=True)
+    def reset_circuit(self):
+        llm_client._circuit.clear()
+        llm_client._ollama_thinking.clear()
+        llm_client._response_cache.clear()
+        yield
+        llm_client._circuit.clear()
+        llm_client._ollama_thinking.clear()
+        llm_client._response_cache.clear()
+
     def test_unavailable_when_none(self):
         with patch("agent.llm_client.settings") as mock_settings:
             mock_settings.llm_provider = "none"
@@ -259,6 +330,318 @@ class TestLLMClient:
             with pytest.raises(LLMClientError, match="No LLM provider"):
                 client.complete("system", "user")
 
+    def test_error_on_unavailable_achat(self):
+        with patch("agent.llm_client.settings") as mock_settings:
+            mock_settings.llm_provider = "none"
+            client = LLMClient()
+            with pytest.raises(LLMClientError, match="No LLM provider"):
+                asyncio.run(client.achat("system", [{"role": "user", "content": "hi"}]))
+
+    def test_acomplete_ollama(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            assert body["messages"][0] == {"role": "system", "content": "system"}
+            return httpx.Response(200, json={"message": {"content": "<think>x</think>done"}})
+
+        mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        test_settings = settings.model_copy(update={
+            "llm_provider": "ollama", "ollama_base_url": "http://ollama", "ollama_model": "m",
+        })
+        with patch("agent.llm_client.settings", test_settings), \
+                patch("agent.llm_client._get_async_httpx_client", return_value=mock_client):
+            client = LLMClient()
+            resp = asyncio.run(client.acomplete("system", "user"))
+        assert resp.text == "done"
+        assert resp.provider == "ollama"
+
+    def _vllm_client(self, handler, **overrides):
+        test_settings = settings.model_copy(update={
+            "llm_provider": "vllm", "vllm_server_url": "http://vllm",
+            "llm_retry_base_delay": 0.0, **overrides,
+        })
+        mock_client = httpx.Client(transport=httpx.MockTransport(handler))
+        return (
+            patch("agent.llm_client.settings", test_settings),
+            patch("agent.llm_client._get_httpx_client", return_value=mock_client),
+        )
+
+    def test_retries_transient_status(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+        p_settings, p_client = self._vllm_client(handler)
+        with p_settings, p_client:
+            resp = LLMClient().complete("system", "user")
+        assert resp.text == "ok"
+        assert len(calls) == 2
+
+    def test_no_retry_on_client_error(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(400)
+
+        p_settings, p_client = self._vllm_client(handler)
+        with p_settings, p_client:
+            with pytest.raises(LLMClientError, match="vllm error"):
+                LLMClient().complete("system", "user")
+        assert len(calls) == 1
+
+    def test_falls_back_to_next_provider(self):
+        read_timeouts = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            read_timeouts[request.url.host] = request.extensions["timeout"]["read"]
+            if request.url.host == "vllm":
+                return httpx.Response(400)
+            return httpx.Response(200, json={"message": {"content": "from ollama"}})
+
+        p_settings, p_client = self._vllm_client(
+            handler, llm_fallback_chain=["ollama"], ollama_base_url="http://ollama",
+            llm_first_attempt_timeout=7.0, llm_timeout_seconds=30.0,
+        )
+        with p_settings, p_client:
+            resp = LLMClient().complete("system", "user")
+        assert resp.provider == "ollama"
+        assert resp.text == "from ollama"
+        # First provider gets the shorter budget, fallback gets the full one
+        assert read_timeouts == {"vllm": 7.0, "ollama": 30.0}
+
+    def test_circuit_opens_after_repeated_failures(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(400)
+
+        p_settings, p_client = self._vllm_client(handler, llm_circuit_failure_threshold=2)
+        with p_settings, p_client:
+            client = LLMClient()
+            for _ in range(2):
+                with pytest.raises(LLMClientError):
+                    client.complete("system", "user")
+            with pytest.raises(LLMClientError, match="circuit open"):
+                client.complete("system", "user")
+        assert len(calls) == 2
+
+    def test_warmup_opens_connection(self):
+        methods = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            methods.append((request.method, request.url.host))
+            return httpx.Response(200)
+
+        p_settings, p_client = self._vllm_client(handler)
+        with p_settings, p_client:
+            LLMClient().warmup()
+        assert methods == [("HEAD", "vllm")]
+
+    def test_aclose_http_clients(self):
+        async def run():
+            aclient = llm_client._get_async_httpx_client()
+            client = llm_client._get_httpx_client()
+            await llm_client.aclose_http_clients()
+            return aclient, client
+
+        aclient, client = asyncio.run(run())
+        assert aclient.is_closed and client.is_closed
+        assert llm_client._get_httpx_client() is not client
+
+    def test_astream_vllm_sse(self):
+        body = (
+            'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+            'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+            "data: [DONE]\n\n"
+        )
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert json.loads(request.content)["stream"] is True
+            return httpx.Response(200, text=body)
+
+        mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        test_settings = settings.model_copy(update={
+            "llm_provider": "vllm", "vllm_server_url": "http://vllm",
+        })
+
+        async def collect():
+            return [c async for c in LLMClient().astream("system", [{"role": "user", "content": "hi"}])]
+
+        with patch("agent.llm_client.settings", test_settings), \
+                patch("agent.llm_client._get_async_httpx_client", return_value=mock_client):
+            assert asyncio.run(collect()) == ["Hel", "lo"]
+
+    def test_astream_llamacpp_drops_think_split_across_events(self):
+        body = (
+            'data: {"content": "<thi"}\n\n'
+            'data: {"content": "nk>plan</th"}\n\n'
+            'data: {"content": "ink>\\nHel"}\n\n'
+            'data: {"content": "lo <"}\n\n'
+            'data: {"content": "b>"}\n\n'
+        )
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=body)
+
+        mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        test_settings = settings.model_copy(update={
+            "llm_provider": "llamacpp", "llamacpp_server_url": "http://llamacpp",
+        })
+
+        async def collect():
+            return [c async for c in LLMClient().astream("system", [{"role": "user", "content": "hi"}])]
+
+        with patch("agent.llm_client.settings", test_settings), \
+                patch("agent.llm_client._get_async_httpx_client", return_value=mock_client):
+            chunks = asyncio.run(collect())
+        assert "".join(chunks) == "Hello <b>"
+        assert not any("think" in c or "plan" in c for c in chunks)
+
+    def test_ollama_think_flag_only_for_reasoning_models(self):
+        bodies = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/api/show":
+                return httpx.Response(200, json={"capabilities": ["completion"]})
+            bodies.append(json.loads(request.content))
+            return httpx.Response(200, json={"message": {"content": "answer"}})
+
+        test_settings = settings.model_copy(update={
+            "llm_provider": "ollama", "ollama_base_url": "http://ollama", "ollama_model": "m",
+        })
+        mock_client = httpx.Client(transport=httpx.MockTransport(handler))
+        with patch("agent.llm_client.settings", test_settings), \
+                patch("agent.llm_client._get_httpx_client", return_value=mock_client):
+            resp = LLMClient().complete("system", "user")
+        assert resp.text == "answer"
+        assert "think" not in bodies[0]
+        assert llm_client._ollama_thinking[("http://ollama", "m")] is False
+
+    def test_openai_uses_compatible_path_with_bearer(self):
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["url"] = str(request.url)
+            seen["auth"] = request.headers.get("authorization")
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "hi"}}]})
+
+        test_settings = settings.model_copy(update={
+            "llm_provider": "openai", "openai_api_key": "sk-test", "openai_model": "gpt-x",
+        })
+        mock_client = httpx.Client(transport=httpx.MockTransport(handler))
+        with patch("agent.llm_client.settings", test_settings), \
+                patch("agent.llm_client._get_httpx_client", return_value=mock_client):
+            resp = LLMClient().complete("system", "user")
+        assert resp.text == "hi" and resp.provider == "openai"
+        assert seen["url"] == "https://api.openai.com/v1/chat/completions"
+        assert seen["auth"] == "Bearer sk-test"
+        assert [m["role"] for m in seen["body"]["messages"]] == ["system", "user"]
+
+    def test_openai_base_url_and_organization_from_settings(self):
+        test_settings = settings.model_copy(update={
+            "openai_api_key": "sk-test", "openai_base_url": "https://proxy.example/",
+            "openai_organization": "org-123",
+        })
+        with patch("agent.llm_client.settings", test_settings):
+            url, _, headers = LLMClient()._openai_request("system", [], stream=False)
+        assert url == "https://proxy.example/v1/chat/completions"
+        assert headers["openai-organization"] == "org-123"
+        assert headers["authorization"] == "Bearer sk-test"
+
+    def test_llamacpp_prompt_template(self):
+        url, body, _ = LLMClient._llamacpp_request(
+            "SYS", [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "yo"}],
+            stream=False,
+        )
+        assert url.endswith("/completion")
+        assert json.loads(body)["prompt"] == (
+            "<|system|>\nSYS\n<|user|>\nhi\n<|assistant|>\nyo\n<|assistant|>\n"
+        )
+
+    def test_prompt_budget_drops_oldest_turns(self):
+        test_settings = settings.model_copy(update={"llm_prompt_budget_tokens": 30})
+        messages = [
+            {"role": "user", "content": "a" * 80},
+            {"role": "assistant", "content": "b" * 40},
+            {"role": "user", "content": "c" * 40},
+        ]
+        with patch("agent.llm_client.settings", test_settings):
+            kept = llm_client._fit_prompt_budget("s" * 20, messages)
+            assert kept == messages[1:]
+            with pytest.raises(LLMClientError, match="Prompt too long"):
+                llm_client._fit_prompt_budget("s" * 200, messages)
+
+    def test_identical_prompt_served_from_cache_at_zero_temperature(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+        settings_patch, client_patch = self._vllm_client(handler, llm_temperature=0.0)
+        with settings_patch, client_patch:
+            client = LLMClient()
+            first = client.complete("system", "user")
+            second = client.complete("system", "user")
+            client.complete("system", "other")
+        assert second is first
+        assert len(calls) == 2
+
+    def test_fallback_reply_not_cached_for_primary(self):
+        vllm_up = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "vllm":
+                if not vllm_up:
+                    return httpx.Response(400)
+                return httpx.Response(200, json={"choices": [{"message": {"content": "primary"}}]})
+            return httpx.Response(200, json={"message": {"content": "fallback"}})
+
+        settings_patch, client_patch = self._vllm_client(
+            handler, llm_temperature=0.0, llm_fallback_chain=["ollama"],
+            ollama_base_url="http://ollama",
+        )
+        with settings_patch, client_patch:
+            client = LLMClient()
+            assert client.complete("system", "user").provider == "ollama"
+            vllm_up.append(True)
+            resp = client.complete("system", "user")
+        assert resp.provider == "vllm" and resp.text == "primary"
+
+    def test_hedged_request_takes_faster_fallback(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "vllm":
+                await asyncio.sleep(1.0)
+                return httpx.Response(200, json={"choices": [{"message": {"content": "slow"}}]})
+            return httpx.Response(200, json={"message": {"content": "fast"}})
+
+        test_settings = settings.model_copy(update={
+            "llm_provider": "vllm", "vllm_server_url": "http://vllm",
+            "ollama_base_url": "http://ollama", "llm_fallback_chain": ["ollama"],
+            "llm_enable_hedging": True, "llm_hedge_delay_seconds": 0.01,
+        })
+
+        async def run():
+            mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("agent.llm_client.settings", test_settings), \
+                    patch("agent.llm_client._get_async_httpx_client", return_value=mock_client):
+                return await LLMClient().achat("system", [{"role": "user", "content": "hi"}])
+
+        resp = asyncio.run(run())
+        assert resp.text == "fast" and resp.provider == "ollama"
+
+    def test_strip_thinking_removes_block(self):
+        assert _strip_thinking("<think>hmm\nok</think>\n{\"a\": 1}") == '{"a": 1}'
+
+    def test_strip_thinking_passthrough(self):
+        assert _strip_thinking("  plain answer \n") == "plain answer"
+
 
 # ── TestRecommender ──────────────────────────────────────────────────────
 
@@ -312,6 +695,39 @@ class TestRecommender:
         assert result.source == "optimizer_fallback"
         assert result.llm_available is True
 
+    def test_optimizer_reused_for_unchanged_state(self, game_at_arrivals):
+        mock_llm = MagicMock(spec=LLMClient)
+        mock_llm.is_available.return_value = False
+        recommender = Recommender(llm_client=mock_llm)
+        with patch("agent.recommender.optimize_step", wraps=optimize_step) as spy:
+            recommender.recommend(game_at_arrivals, StepType.ARRIVALS, horizon=3, mc_simulations=10)
+            recommender.recommend(game_at_arrivals, StepType.ARRIVALS, horizon=3, mc_simulations=10)
+            assert spy.call_count == 1
+            game_at_arrivals.departments[DepartmentId.ER].arrivals_waiting += 1
+            recommender.recommend(game_at_arrivals, StepType.ARRIVALS, horizon=3, mc_simulations=10)
+            assert spy.call_count == 2
+
+    def test_fewer_simulations_without_llm(self, game_at_arrivals):
+        mock_llm = MagicMock(spec=LLMClient)
+        mock_llm.is_available.return_value = False
+        recommender = Recommender(llm_client=mock_llm)
+        with patch("agent.recommender.optimize_step", wraps=optimize_step) as spy:
+            recommender.recommend(
+                game_at_arrivals, StepType.ARRIVALS, horizon=3, mc_simulations=50, mc_fast=5
+            )
+        assert spy.call_args.kwargs["mc_simulations"] == 5
+
+    def test_unexpected_error_propagates(self, game_at_arrivals):
+        """Bugs in the LLM path are not masked as an optimizer fallback."""
+        mock_llm = MagicMock(spec=LLMClient)
+        mock_llm.is_available.return_value = True
+        mock_llm.complete.side_effect = RuntimeError("bug")
+        recommender = Recommender(llm_client=mock_llm)
+        with pytest.raises(RuntimeError):
+            recommender.recommend(
+                game_at_arrivals, StepType.ARRIVALS, horizon=3, mc_simulations=10
+            )
+
     def test_fallback_on_invalid_json(self, game_at_arrivals):
         """When LLM returns unparseable text, falls back to optimizer."""
         mock_llm = MagicMock(spec=LLMClient)
@@ -362,6 +778,23 @@ class TestRecommender:
             assert len(result.optimizer_candidates) > 0
             assert result.baseline_cost > 0
 
+    def test_mutating_response_leaves_cache_intact(self, game_at_arrivals):
+        """Edits to a returned recommendation don't leak into the next one."""
+        with patch("agent.llm_client.settings") as mock_settings:
+            mock_settings.llm_provider = "none"
+            recommender = Recommender(llm_client=LLMClient())
+            first = recommender.recommend(
+                game_at_arrivals, StepType.ARRIVALS, horizon=3, mc_simulations=10
+            )
+            expected = copy.deepcopy(asdict(first))
+            first.recommended_action.clear()
+            for candidate in first.optimizer_candidates:
+                candidate.clear()
+            second = recommender.recommend(
+                game_at_arrivals, StepType.ARRIVALS, horizon=3, mc_simulations=10
+            )
+        assert asdict(second) == expected
+
     def test_works_for_all_decision_steps(self, game_at_arrivals):
         """Recommender returns valid results for all 4 decision steps."""
         with patch("agent.llm_client.settings") as mock_settings:
@@ -195,6 +195,20 @@ class TestStepSequence:
         })
         assert r.status_code == 400
 
+    def test_rejected_step_logged_without_saving(self):
+        from db.database import get_db
+        game_id = create_game()
+        client.post(f"/api/game/{game_id}/step/arrivals", json={"admissions": []})
+        with get_db() as conn:
+            actions = conn.execute(
+                "SELECT step, result FROM actions WHERE game_id=?", (game_id,)
+            ).fetchall()
+            snapshots = conn.execute(
+                "SELECT COUNT(*) FROM state_snapshots WHERE game_id=?", (game_id,)
+            ).fetchone()[0]
+        assert [tuple(a) for a in actions] == [("arrivals", "error")]
+        assert snapshots == 1
+
 
 class TestHistory:
     def test_cost_history_after_round(self):
@@ -206,6 +220,53 @@ class TestHistory:
         assert len(data["round_costs"]) == 1
         assert data["round_costs"][0]["round_number"] == 1
 
+    def test_history_before_first_round(self):
+        game_id = create_game()
+        r = client.get(f"/api/game/{game_id}/history")
+        assert r.json() == {
+            "game_id": game_id,
+            "round_costs": [],
+            "total_financial_cost": 0,
+            "total_quality_cost": 0,
+        }
+        assert client.get("/api/game/missing/history").status_code == 404
+
+    def test_export_csv_totals(self):
+        game_id = create_game()
+        assert client.get(f"/api/game/{game_id}/export/csv").status_code == 400
+        play_one_round(game_id)
+        play_one_round(game_id)
+        lines = client.get(f"/api/game/{game_id}/export/csv").text.splitlines()
+        assert len(lines) == 4
+        header, r1, r2, total = (line.split(",") for line in lines)
+        assert len(header) == len(r1) == len(total) == 29
+        assert total[0] == "TOTAL"
+        assert int(total[-4]) == int(r1[-4]) + int(r2[-4]) == int(total[-2])
+
+    def test_replay_costs_match_history(self):
+        game_id = create_game()
+        play_one_round(game_id)
+        play_one_round(game_id)
+        replay = client.get(f"/api/game/{game_id}/replay").json()
+        history = client.get(f"/api/game/{game_id}/history").json()
+        assert [r["round_number"] for r in replay["rounds"]] == [1, 2]
+        assert [r["costs"]["financial"] for r in replay["rounds"]] == [
+            rc["financial"] for rc in history["round_costs"]
+        ]
+        assert client.get("/api/game/missing/replay").status_code == 404
+
+    def test_round_cards(self):
+        from data.card_sequences import get_er_ambulance
+        game_id = create_game()
+        r = client.get(f"/api/game/{game_id}/round-cards/3")
+        assert r.status_code == 200
+        data = r.json()
+        assert data["round"] == 3
+        assert data["departments"]["er"]["ambulance"] == get_er_ambulance(3)
+        assert client.get(f"/api/game/{game_id}/round-cards/3").json() == data
+        assert client.get(f"/api/game/{game_id}/round-cards/25").status_code == 400
+        assert client.get("/api/game/missing/round-cards/3").status_code == 404
+
 
 class TestForecast:
     def test_forecast_endpoint(self):
@@ -227,6 +288,22 @@ class TestForecast:
         assert data["step"] == "arrivals"
         assert "candidates" in data
 
+    def test_forecast_reused_for_unchanged_state(self, monkeypatch):
+        import api.routes_forecast as rf
+        calls = []
+        real = rf.run_monte_carlo
+        monkeypatch.setattr(rf, "run_monte_carlo", lambda *a, **kw: calls.append(1) or real(*a, **kw))
+
+        game_id = create_game()
+        first = client.get(f"/api/game/{game_id}/forecast", params={"horizon": 3}).json()
+        second = client.get(f"/api/game/{game_id}/forecast", params={"horizon": 3}).json()
+        assert first == second
+        assert len(calls) == 1
+
+        client.post(f"/api/game/{game_id}/step/event")
+        client.get(f"/api/game/{game_id}/forecast", params={"horizon": 3})
+        assert len(calls) == 2
+
 
 class TestRecommend:
     def test_recommend_stub(self):
@@ -9,7 +9,8 @@ from data.card_sequences import (
     SURGERY_ARRIVALS, SURGERY_EXITS,
     CC_ARRIVALS, CC_EXITS,
     SD_ARRIVALS, SD_EXITS,
-    get_arrivals, get_exits,
+    get_arrivals, get_exits, get_schedule_window,
+    get_exit_routing, get_exit_destination, get_exit_plan,
 )
 from models.enums import DepartmentId
 
@@ -99,3 +100,29 @@ class TestGetterFunctions:
                     CC_ARRIVALS, CC_EXITS,
                     SD_ARRIVALS, SD_EXITS]:
             assert all(v >= 0 for v in seq)
+
+    def test_schedule_window_matches_getters(self):
+        window = get_schedule_window(3, 9)
+        assert window.shape == (6, len(DepartmentId), 2)
+        for i, rn in enumerate(range(3, 9)):
+            for j, dept in enumerate(DepartmentId):
+                assert window[i, j, 0] == get_arrivals(dept, rn)
+                assert window[i, j, 1] == get_exits(dept, rn)
+
+    def test_exit_destination_matches_routing(self):
+        names = {
+            "out": None,
+            "surgery": DepartmentId.SURGERY,
+            "criticalcare": DepartmentId.CRITICAL_CARE,
+            "stepdown": DepartmentId.STEP_DOWN,
+        }
+        for dept in DepartmentId:
+            for i in range(100):
+                assert get_exit_destination(dept, i) == names[get_exit_routing(dept, i)]
+
+    def test_exit_plan_groups_destinations(self):
+        assert get_exit_plan(DepartmentId.SURGERY, 5) == (
+            0, ((DepartmentId.STEP_DOWN, 4), (DepartmentId.CRITICAL_CARE, 1)),
+        )
+        assert get_exit_plan(DepartmentId.STEP_DOWN, 3) == (3, ())
+        assert get_exit_plan(DepartmentId.ER, 0) == (0, ())
@@ -47,6 +47,12 @@ class TestEventDrawing:
         for dept_id in events1:
             assert events1[dept_id].event_id == events2[dept_id].event_id
 
+    def test_events_indexed_by_id(self):
+        from data.event_pools import EVENT_POOLS, EVENTS_BY_ID
+        assert len(EVENTS_BY_ID) == sum(len(pool) for pool in EVENT_POOLS.values())
+        for event in draw_events(6, seed=7).values():
+            assert EVENTS_BY_ID[event.event_id].effect == event.effect
+
 
 class TestEventApplication:
 
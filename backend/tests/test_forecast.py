@@ -321,6 +321,40 @@ class TestOptimizer:
         assert result.horizon_used == 4
         assert result.step == "arrivals"
 
+    def test_override_policy_reusable_across_simulations(self, fresh_game: GameState):
+        """Every simulation sharing an override policy applies the override."""
+        from forecast.optimizer import _make_policy_with_override, _generate_arrivals_candidates
+        state = process_event_step(fresh_game, event_seed=42)
+        _, action = _generate_arrivals_candidates(state)[-1]
+        policy = _make_policy_with_override(state, StepType.ARRIVALS, action)
+        first = run_lookahead(state, horizon=4, policy=policy, event_seed=0)
+        second = run_lookahead(state, horizon=4, policy=policy, event_seed=0)
+        assert first.total_financial == second.total_financial
+        assert first.total_quality == second.total_quality
+
+    def test_screening_runs_full_mc_on_front_runners_only(self, fresh_game: GameState, monkeypatch):
+        """Survivors get a short MC screen; only the best get the full run."""
+        import forecast.optimizer as opt
+        sims_used = []
+        real = opt.run_monte_carlo
+
+        def counting(*args, **kwargs):
+            sims_used.append(kwargs["num_simulations"])
+            return real(*args, **kwargs)
+
+        from forecast.lookahead import _default_arrivals, _default_exits
+        state = process_event_step(fresh_game, event_seed=42)
+        state = process_arrivals_step(state, _default_arrivals(state))
+        state = process_exits_step(state, _default_exits(state))
+        state = process_closed_step(state, ClosedAction())
+
+        monkeypatch.setattr(opt, "run_monte_carlo", counting)
+        result = optimize_step(state, horizon=4, mc_simulations=40, base_seed=42, screen_simulations=10)
+
+        n = len(result.candidates)
+        assert n > opt.MC_FULL_TOP_K
+        assert sims_used == [10] * n + [40] * opt.MC_FULL_TOP_K
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # TestMetrics
@@ -60,6 +60,22 @@ class TestFullGame:
         assert sd.patients_in_beds == 20
         assert sd.bed_capacity == 30
 
+    def test_new_games_share_no_state(self):
+        """Games created from the cached default template are independent."""
+        first = create_game("first")
+        second = create_game("second")
+        assert second.game_id == "second"
+
+        er = first.departments[DepartmentId.ER]
+        er.patients_in_beds = 0
+        er.staff.core_busy = 0
+        er.requests_waiting[DepartmentId.SURGERY] = 3
+
+        er2 = second.departments[DepartmentId.ER]
+        assert er2.patients_in_beds == 16
+        assert er2.staff.core_busy == 16
+        assert er2.requests_waiting == {}
+
     def test_patients_never_negative(self):
         """Patient counts should never go negative during a game."""
         game = create_game("negative-test")
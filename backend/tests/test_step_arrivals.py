@@ -49,6 +49,20 @@ class TestNewArrivals:
         assert er.patients_in_beds == 18  # was 16, admitted 2
         assert er.staff.core_busy == 18   # was 16, now all busy
 
+    def test_admit_overflows_to_extra_staff_and_hallway(self):
+        """Admissions past idle core staff and free beds spill over in one go."""
+        from engine.step_arrivals import _admit_patients
+        er = create_starting_state("test").departments[DepartmentId.ER]
+        er.staff.extra_total = 10
+        assert er.staff.total_idle == 12
+        _admit_patients(er, 12)  # 2 idle core + 10 idle extra staff, 9 free beds
+
+        assert er.staff.core_busy == 18
+        assert er.staff.extra_busy == 10
+        assert er.staff.total_idle == 0
+        assert er.patients_in_beds == 25
+        assert er.patients_in_hallway == 3
+
     def test_step_advances_to_exits(self):
         """After arrivals, step should be EXITS."""
         game = create_starting_state("test")